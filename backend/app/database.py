@@ -1,15 +1,97 @@
 import os
+import threading
+import time
+from typing import Dict
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 from dotenv import load_dotenv
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+# Optional read replica for read-only list endpoints; falls back to the primary
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
+
+# Connection pool, per engine (per process)
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+# Seconds to wait for a free connection before giving up
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Replace connections older than this many seconds (-1 keeps them forever)
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() != "false"
+# Per-statement limit in milliseconds on Postgres; 0 disables it
+STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+
+class MeteredQueuePool(QueuePool):
+    """
+    QueuePool that records how long checkouts wait for a connection and how
+    often they time out
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "checkouts": 0,
+            "timeouts": 0,
+            "total_wait": 0.0,
+            "max_wait": 0.0
+        }
+
+    def connect(self):
+        started = time.monotonic()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            with self._stats_lock:
+                self._stats["timeouts"] += 1
+            raise
+        waited = time.monotonic() - started
+        with self._stats_lock:
+            self._stats["checkouts"] += 1
+            self._stats["total_wait"] += waited
+            self._stats["max_wait"] = max(self._stats["max_wait"], waited)
+        return connection
+
+    def metrics(self) -> Dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["avg_wait"] = round(stats["total_wait"] / stats["checkouts"], 4) if stats["checkouts"] else 0.0
+        stats["total_wait"] = round(stats["total_wait"], 3)
+        stats["max_wait"] = round(stats["max_wait"], 4)
+        stats["size"] = self.size()
+        stats["checked_out"] = self.checkedout()
+        stats["overflow"] = self.overflow()
+        stats["idle"] = self.checkedin()
+        return stats
+
+def _create_engine(url: str):
+    options = {}
+    parsed = make_url(url)
+    # In-memory SQLite needs its single shared connection, not a queue
+    if not (parsed.get_backend_name() == 'sqlite' and parsed.database in (None, '', ':memory:')):
+        options.update(
+            poolclass=MeteredQueuePool,
+            pool_size=POOL_SIZE,
+            max_overflow=MAX_OVERFLOW,
+            pool_timeout=POOL_TIMEOUT,
+            pool_recycle=POOL_RECYCLE,
+            pool_pre_ping=POOL_PRE_PING
+        )
+    if parsed.get_backend_name() == 'postgresql' and STATEMENT_TIMEOUT_MS > 0:
+        options["connect_args"] = {"options": f"-c statement_timeout={STATEMENT_TIMEOUT_MS}"}
+    return create_engine(url, **options)
+
+engine = _create_engine(DATABASE_URL)
+read_engine = _create_engine(DATABASE_READ_URL) if DATABASE_READ_URL else engine
 
-engine = create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 Base = declarative_base()
 
 def get_db():
@@ -17,4 +99,23 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+def get_read_db():
+    """
+    Session for read-only endpoints, on the replica when DATABASE_READ_URL is set
+    """
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def pool_metrics() -> Dict:
+    engines = {"primary": engine}
+    if read_engine is not engine:
+        engines["replica"] = read_engine
+    return {
+        name: bound.pool.metrics() if isinstance(bound.pool, MeteredQueuePool) else {"status": bound.pool.status()}
+        for name, bound in engines.items()
+    }
@@ -1,51 +1,50 @@
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import select, func
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+import json
+from contextlib import asynccontextmanager
 import time
+from datetime import datetime, timezone
 
-from app.database import engine, Base, get_db
-from app.models.auction import Auction
-from app.services.scraper import main as run_scraper
-from app.services.analysis import analyze_auction_item
-from app.services.detail_scraper import scrape_auction_details
-from app.services.utils import parse_price
-from app.services.price_research import price_research
+from app.database import SessionLocal, ReadSessionLocal, get_db, get_read_db, pool_metrics
+from app.migrations import startup_migrate
+from app.models.auction import Auction, OPPORTUNITY_RATIO, CONFIDENCE_LEVELS
+from app.models.job import JOB_FINISHED_STATUSES
+from app.services.auction_pipeline import analyze_auction_by_id
+from app.services.research_snapshots import get_research
+from app.services.browser_pool import browser_pool
+from app.services.page_waits import wait_metrics
+from app.services.ingest import crawl_into_db
+from app.services.shopgoodwill_api import resolve_backend
+from app.services.resource_filter import bandwidth_metrics
+from app.services.jobs import job_queue, get_job_snapshot, JOB_ANALYZE, JOB_REANALYZE, JOB_SCREEN
+from app.services.research_cache import cache_metrics
+from app.services.http_client import http_metrics
+from app.services.ebay_api import ebay_api
+from app.services.image_store import image_metrics
+from app.services.scheduler import scheduler, refresh_queue, SCHEDULER_ENABLED
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+# Bring the schema up to date; a single version lookup when nothing is pending
+startup_migrate()
 
-# Add migrations for new columns
-with engine.connect() as conn:
-    try:
-        # Check and add new columns if they don't exist
-        columns_to_add = [
-            ("is_watchlisted", "BOOLEAN DEFAULT FALSE"),
-            ("description", "TEXT"),
-            ("all_images", "JSON"),
-            ("num_bids", "VARCHAR"),
-            ("seller", "VARCHAR"),
-            ("item_details", "JSON"),
-            ("details_scraped", "BOOLEAN DEFAULT FALSE")
-        ]
-        
-        for column_name, column_type in columns_to_add:
-            result = conn.execute(text(f"""
-                SELECT column_name 
-                FROM information_schema.columns 
-                WHERE table_name='auctions' AND column_name='{column_name}'
-            """))
-            if not result.fetchone():
-                conn.execute(text(f"ALTER TABLE auctions ADD COLUMN {column_name} {column_type}"))
-                print(f"Added column: {column_name}")
-        
-        conn.commit()
-    except Exception as e:
-        print(f"Migration check failed: {e}")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Launch the shared pool's browsers now so the first scrape doesn't pay for it
+    await asyncio.to_thread(browser_pool.start, True)
+    job_queue.start()
+    # Periodic crawls and price refreshes; disable here when a separate worker runs them
+    if SCHEDULER_ENABLED:
+        scheduler.start()
+    yield
+    await asyncio.to_thread(scheduler.stop)
+    await asyncio.to_thread(job_queue.stop)
+    await asyncio.to_thread(browser_pool.shutdown)
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Configure CORS - be more permissive for now
 app.add_middleware(
@@ -60,192 +59,226 @@ app.add_middleware(
 def read_root():
     return {"message": "Welcome to the Auction Analysis Agent"}
 
+@app.get("/metrics")
+def get_metrics():
+    return {
+        "browser_pool": browser_pool.metrics(),
+        "page_waits": wait_metrics(),
+        "bandwidth": bandwidth_metrics(),
+        "research_cache": cache_metrics(),
+        "http": http_metrics(),
+        "ebay": ebay_api.metrics(),
+        "images": image_metrics(),
+        "scheduler": scheduler.metrics(),
+        "db_pool": pool_metrics()
+    }
+
 @app.post("/scrape")
-def scrape_auctions(db: Session = Depends(get_db)):
+def scrape_auctions(
+    categories: list[str] | None = Query(None),
+    max_pages: int | None = None,
+    backend: str | None = None,
+    db: Session = Depends(get_db)
+):
+    try:
+        resolve_backend(backend)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     try:
         print("Starting scrape...")
-        scraped_data = run_scraper()
-        print(f"Scraped {len(scraped_data)} items")
-        
-        new_items = 0
-        for item in scraped_data:
-            # Check if the auction already exists
-            exists = db.query(Auction).filter(Auction.auction_url == item['auction_url']).first()
-            if not exists:
-                db_auction = Auction(**item)
-                db.add(db_auction)
-                new_items += 1
-        
-        db.commit()
-        print(f"Added {new_items} new items to database")
-        
-        auctions = db.query(Auction).all()
-        return {"auctions": auctions}
+        return crawl_into_db(db, categories, max_pages=max_pages, backend=backend)
     except Exception as e:
         print(f"Error during scrape: {e}")
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
+# Columns the list endpoint can project, plus a short analysis excerpt for cards
+AUCTION_FIELDS = {column.name: column for column in Auction.__table__.columns}
+AUCTION_FIELDS['analysis_preview'] = func.substr(Auction.analysis, 1, 300).label('analysis_preview')
+
+def _auction_columns(fields: str | None):
+    if not fields:
+        return [AUCTION_FIELDS[name] for name in Auction.__table__.columns.keys()]
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in AUCTION_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    # id is always returned; it is the pagination cursor
+    return [Auction.id] + [AUCTION_FIELDS[name] for name in names if name != 'id']
+
 @app.get("/auctions")
-def get_auctions(db: Session = Depends(get_db)):
+def get_auctions(
+    limit: int = Query(50, ge=1, le=500),
+    after_id: int | None = None,
+    fields: str | None = None,
+    watchlisted: bool | None = None,
+    analyzed: bool | None = None,
+    min_margin: float | None = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    db: Session = Depends(get_read_db)
+):
+    """
+    List auctions in id order, a page at a time. Pass the returned next_cursor
+    as after_id for the next page. format=ndjson streams every matching row
+    (ignoring limit) as newline-delimited JSON for exports.
+    """
+    query = select(*_auction_columns(fields)).order_by(Auction.id)
+    if watchlisted is not None:
+        query = query.where(Auction.is_watchlisted.is_(True) if watchlisted else Auction.is_watchlisted.isnot(True))
+    if analyzed is not None:
+        query = query.where(Auction.estimated_value.isnot(None) if analyzed else Auction.estimated_value.is_(None))
+    if min_margin is not None:
+        query = query.where(Auction.estimated_value - Auction.price_value >= min_margin)
+    if after_id is not None:
+        query = query.where(Auction.id > after_id)
+
+    if format == "ndjson":
+        return StreamingResponse(_stream_ndjson(query), media_type="application/x-ndjson")
+
     try:
-        print("Fetching auctions from database...")
-        auctions = db.query(Auction).all()
-        print(f"Found {len(auctions)} auctions")
-        return {"auctions": auctions}
+        auctions = db.execute(query.limit(limit)).mappings().all()
+        next_cursor = auctions[-1]['id'] if len(auctions) == limit else None
+        return {"auctions": auctions, "next_cursor": next_cursor}
     except Exception as e:
         print(f"Error fetching auctions: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/analyze/{auction_id}")
-def analyze_auction(auction_id: int, db: Session = Depends(get_db)):
-    try:
-        db_auction = db.query(Auction).filter(Auction.id == auction_id).first()
-        if not db_auction:
-            raise HTTPException(status_code=404, detail="Auction not found")
+def _stream_ndjson(query):
+    # The request-scoped session may be closed before the stream finishes
+    with ReadSessionLocal() as db:
+        for row in db.execute(query.execution_options(yield_per=500)).mappings():
+            yield json.dumps(jsonable_encoder(dict(row))) + "\n"
 
-        # First, scrape detailed information if we haven't already
-        if not db_auction.details_scraped:
-            print(f"Scraping detailed information for auction {auction_id}")
-            details = scrape_auction_details(db_auction.auction_url)
-            
-            if details:
-                # Update the auction with detailed information
-                if 'description_text' in details:
-                    db_auction.description = details['description_text']
-                if 'all_images' in details:
-                    db_auction.all_images = details['all_images']
-                if 'num_bids' in details:
-                    db_auction.num_bids = details['num_bids']
-                if 'seller' in details:
-                    db_auction.seller = details['seller']
-                if 'item_details' in details:
-                    db_auction.item_details = details['item_details']
-                
-                db_auction.details_scraped = True
-                db.commit()
-                print(f"Updated auction with detailed information. Images: {len(details.get('all_images', []))}")
-
-        # Now analyze with all available information
-        print(f"Analyzing auction with {len(db_auction.all_images) if db_auction.all_images else 1} images")
-        estimated_value, analysis = analyze_auction_item(
-            db_auction.title, 
-            db_auction.image_url,
-            description=db_auction.description,
-            all_images=db_auction.all_images,
-            current_price=db_auction.price
-        )
+@app.get("/auctions/{auction_id}")
+def get_auction(auction_id: int, db: Session = Depends(get_db)):
+    db_auction = db.query(Auction).filter(Auction.id == auction_id).first()
+    if not db_auction:
+        raise HTTPException(status_code=404, detail="Auction not found")
+    return db_auction
 
-        db_auction.estimated_value = estimated_value
-        db_auction.analysis = analysis
-        db.commit()
-        db.refresh(db_auction)
-        
-        return db_auction
-    except Exception as e:
-        print(f"Error analyzing auction: {e}")
-        db.rollback()
-        raise HTTPException(status_code=500, detail=str(e))
+@app.post("/analyze/batch", status_code=202)
+def analyze_batch(auction_ids: list[int], refresh: bool = False, mode: str = "full", db: Session = Depends(get_db)):
+    """
+    Queue a batch analysis and return its job right away.
+    Follow progress with GET /jobs/{job_id} or GET /jobs/{job_id}/events.
+    refresh=true re-runs the model even where a cached response exists.
+    mode=screen appraises the auctions several per request first and only
+    runs the full analysis on the promising ones.
+    """
+    if not auction_ids:
+        raise HTTPException(status_code=400, detail="No auction ids given")
+    if mode not in ("full", "screen"):
+        raise HTTPException(status_code=400, detail="mode must be 'full' or 'screen'")
+    if mode == "screen":
+        kind = JOB_SCREEN
+    else:
+        kind = JOB_REANALYZE if refresh else JOB_ANALYZE
+    job = job_queue.submit(db, auction_ids, kind=kind)
+    print(f"Queued job {job.id} for {len(auction_ids)} auctions")
+    return {"job_id": job.id, "status": job.status, "total": job.total}
+
+@app.post("/analyze/{auction_id}/stream")
+async def analyze_auction_stream(auction_id: int, refresh: bool = False):
+    """
+    Analyze one auction, streaming progress as server-sent events:
+    'stage' (details, research, model), 'source' as each research source
+    answers, 'token' with model output as it arrives, then 'done' with the
+    saved auction (or 'error'). The result is saved the same way as
+    POST /analyze/{auction_id}, even if the client disconnects.
+    """
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+
+    def emit(event: str, data):
+        try:
+            loop.call_soon_threadsafe(events.put_nowait, (event, data))
+        except RuntimeError:
+            pass  # event loop gone; nobody is listening
+
+    def work():
+        try:
+            with SessionLocal() as db:
+                db_auction = analyze_auction_by_id(db, auction_id, force_refresh=refresh, on_event=emit)
+                if db_auction is None:
+                    emit("error", {"detail": "Auction not found"})
+                else:
+                    emit("done", jsonable_encoder(db_auction))
+        except Exception as e:
+            print(f"Error analyzing auction: {e}")
+            emit("error", {"detail": str(e)})
+
+    async def stream():
+        worker = asyncio.ensure_future(asyncio.to_thread(work))
+        while True:
+            event, data = await events.get()
+            yield f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+            if event in ("done", "error"):
+                break
+        await worker
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
 
-@app.post("/analyze/batch")
-async def analyze_batch(auction_ids: list[int], db: Session = Depends(get_db)):
+@app.post("/analyze/{auction_id}")
+def analyze_auction(auction_id: int, background: bool = True, refresh: bool = False, db: Session = Depends(get_db)):
     """
-    Analyze multiple auctions in batch with concurrent processing
+    Queue an analysis job and return 202 with its id; follow it at
+    /jobs/{job_id}. background=false analyzes within the request instead and
+    returns the updated auction, for scripts that want the result in one call.
     """
+    if background:
+        if not db.query(Auction.id).filter(Auction.id == auction_id).first():
+            raise HTTPException(status_code=404, detail="Auction not found")
+        job = job_queue.submit(db, [auction_id], kind=JOB_REANALYZE if refresh else JOB_ANALYZE)
+        return JSONResponse(status_code=202, content={"job_id": job.id, "status": job.status, "total": job.total})
+
     try:
-        results = []
-        errors = []
-        
-        # Create a thread pool for concurrent processing
-        with ThreadPoolExecutor(max_workers=3) as executor:
-            futures = []
-            
-            for auction_id in auction_ids:
-                # Submit each analysis to the thread pool
-                future = executor.submit(
-                    analyze_single_auction, 
-                    auction_id, 
-                    db
-                )
-                futures.append((auction_id, future))
-            
-            # Collect results as they complete
-            for auction_id, future in futures:
-                try:
-                    result = future.result(timeout=120)  # 2 minute timeout per item
-                    if result:
-                        results.append(result)
-                except Exception as e:
-                    print(f"Error analyzing auction {auction_id}: {e}")
-                    errors.append({"id": auction_id, "error": str(e)})
-        
-        return {
-            "analyzed": results,
-            "errors": errors,
-            "total_analyzed": len(results),
-            "total_errors": len(errors)
-        }
-        
+        db_auction = analyze_auction_by_id(db, auction_id, force_refresh=refresh)
     except Exception as e:
-        print(f"Error in batch analysis: {e}")
+        print(f"Error analyzing auction: {e}")
+        db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
-def analyze_single_auction(auction_id: int, db: Session):
+    if not db_auction:
+        raise HTTPException(status_code=404, detail="Auction not found")
+    return db_auction
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = get_job_snapshot(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
     """
-    Analyze a single auction (used for concurrent processing)
+    Server-sent events with the job's state whenever it changes, ending once it finishes
     """
-    try:
-        db_auction = db.query(Auction).filter(Auction.id == auction_id).first()
-        if not db_auction:
-            raise ValueError("Auction not found")
-
-        # First, scrape detailed information if we haven't already
-        if not db_auction.details_scraped:
-            print(f"Scraping detailed information for auction {auction_id}")
-            details = scrape_auction_details(db_auction.auction_url)
-            
-            if details:
-                # Update the auction with detailed information
-                if 'description_text' in details:
-                    db_auction.description = details['description_text']
-                if 'all_images' in details:
-                    db_auction.all_images = details['all_images']
-                if 'num_bids' in details:
-                    db_auction.num_bids = details['num_bids']
-                if 'seller' in details:
-                    db_auction.seller = details['seller']
-                if 'item_details' in details:
-                    db_auction.item_details = details['item_details']
-                
-                db_auction.details_scraped = True
-                db.commit()
-                print(f"Updated auction with detailed information. Images: {len(details.get('all_images', []))}")
-
-        # Now analyze with all available information
-        print(f"Analyzing auction {auction_id} with {len(db_auction.all_images) if db_auction.all_images else 1} images")
-        estimated_value, analysis = analyze_auction_item(
-            db_auction.title, 
-            db_auction.image_url,
-            description=db_auction.description,
-            all_images=db_auction.all_images,
-            current_price=db_auction.price
-        )
+    async def stream():
+        last = None
+        while True:
+            job = await asyncio.to_thread(get_job_snapshot, job_id)
+            if job is None:
+                yield f"event: error\ndata: {json.dumps({'detail': 'Job not found'})}\n\n"
+                return
+            payload = json.dumps(job)
+            if payload != last:
+                yield f"event: progress\ndata: {payload}\n\n"
+                last = payload
+            if job["status"] in JOB_FINISHED_STATUSES:
+                yield f"event: done\ndata: {payload}\n\n"
+                return
+            await asyncio.sleep(1)
 
-        db_auction.estimated_value = estimated_value
-        db_auction.analysis = analysis
-        db.commit()
-        db.refresh(db_auction)
-        
-        return db_auction
-        
-    except Exception as e:
-        print(f"Error in analyze_single_auction for {auction_id}: {e}")
-        raise
+    return StreamingResponse(stream(), media_type="text/event-stream")
 
 @app.get("/market-research/{auction_id}")
-def get_market_research(auction_id: int, db: Session = Depends(get_db)):
+def get_market_research(auction_id: int, refresh: bool = False, db: Session = Depends(get_db)):
     """
-    Get market research data for a specific auction
+    Get market research data for a specific auction.
+    Served from the auction's latest research snapshot (usually the one its
+    analysis just took) unless that is stale or refresh is set.
     """
     try:
         db_auction = db.query(Auction).filter(Auction.id == auction_id).first()
@@ -253,15 +286,18 @@ def get_market_research(auction_id: int, db: Session = Depends(get_db)):
             raise HTTPException(status_code=404, detail="Auction not found")
         
         print(f"Getting market research for: {db_auction.title}")
-        research_data = price_research.research_item_value(
+        research_data, snapshot = get_research(
+            auction_id,
             db_auction.title, 
-            db_auction.description
+            db_auction.description,
+            refresh=refresh
         )
         
         return {
             "auction_id": auction_id,
             "title": db_auction.title,
-            "market_research": research_data
+            "market_research": research_data,
+            "snapshot": snapshot
         }
         
     except Exception as e:
@@ -269,21 +305,39 @@ def get_market_research(auction_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/opportunities")
-def get_opportunities(db: Session = Depends(get_db)):
-    all_auctions = db.query(Auction).filter(Auction.estimated_value != None).all()
-    
-    opportunities = []
-    for auction in all_auctions:
-        current_price = parse_price(auction.price)
-        if current_price is None or auction.estimated_value is None:
-            continue
-            
-        # Define an opportunity as estimated value being > 50% of current price
-        if auction.estimated_value > (current_price * 1.5):
-            opportunities.append(auction)
+def get_opportunities(
+    limit: int = Query(100, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    min_confidence: str | None = Query(None, pattern="^(low|medium|high)$"),
+    db: Session = Depends(get_read_db)
+):
+    # Define an opportunity as estimated value being > 50% over current price.
+    # Both expressions match the expression indexes on Auction.
+    margin = Auction.estimated_value - Auction.price_value
+    query = db.query(Auction).filter(Auction.estimated_value - OPPORTUNITY_RATIO * Auction.price_value > 0)
+    if min_confidence:
+        query = query.filter(Auction.value_confidence.in_(CONFIDENCE_LEVELS[CONFIDENCE_LEVELS.index(min_confidence):]))
+    opportunities = (
+        query
+        .order_by(margin.desc(), Auction.id)
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
             
     return {"auctions": opportunities}
 
+@app.get("/refresh-queue")
+def get_refresh_queue(limit: int = Query(50, ge=1, le=500), db: Session = Depends(get_db)):
+    """
+    Tracked auctions due a price/bid refresh, in the order the scheduler will take them
+    """
+    query = refresh_queue(datetime.now(timezone.utc)).with_only_columns(
+        Auction.id, Auction.title, Auction.ends_at, Auction.refreshed_at,
+        Auction.price_value, Auction.estimated_value, Auction.is_watchlisted
+    )
+    return {"auctions": [row._asdict() for row in db.execute(query.limit(limit))]}
+
 @app.post("/watchlist/{auction_id}")
 def toggle_watchlist(auction_id: int, db: Session = Depends(get_db)):
     db_auction = db.query(Auction).filter(Auction.id == auction_id).first()
@@ -0,0 +1,192 @@
+"""
+Versioned schema migrations.
+
+The schema_migrations table records every applied step. At startup,
+migrate() costs a single version lookup when nothing is pending; otherwise
+it takes a lock (a Postgres advisory lock) so concurrent workers don't race
+on DDL, and applies each pending step in its own transaction. Steps after
+the baseline must be idempotent (see MIGRATIONS).
+
+Offline use, e.g. before rolling out new workers:
+    python -m app.migrations upgrade    apply pending migrations
+    python -m app.migrations current    print the applied version
+    python -m app.migrations history    list migrations and their state
+"""
+import os
+import sys
+from datetime import datetime, timezone
+from typing import Callable, List, NamedTuple
+from dotenv import load_dotenv
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, insert, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex
+from app.database import Base, engine
+# Register every model on Base.metadata
+from app.models import auction, cache_entry, job, research_snapshot, scheduler_task  # noqa: F401
+
+load_dotenv()
+
+# Apply pending migrations when the app starts; turn off when a deploy step runs the CLI
+AUTO_MIGRATE = os.getenv("AUTO_MIGRATE", "true").lower() != "false"
+
+# Arbitrary key identifying the migration lock among Postgres advisory locks
+LOCK_KEY = 7_314_209
+
+# Kept out of Base.metadata so create_all never touches it
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime(timezone=True), nullable=False)
+)
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    apply: Callable[[Connection], None]
+
+def _baseline(conn: Connection):
+    # Fresh databases get every table as the models define them. Databases
+    # from before versioning get any tables and columns they are missing.
+    Base.metadata.create_all(bind=conn)
+    for table in Base.metadata.sorted_tables:
+        _add_missing_columns(conn, table)
+
+def _create_indexes(conn: Connection):
+    # Every index the models declare, including those added after a table
+    # was first created (create_all skips existing tables)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            conn.execute(CreateIndex(index, if_not_exists=True))
+
+def _backfill(conn: Connection):
+    from app.services.ingest import backfill_numeric_columns, backfill_end_times
+
+    with Session(bind=conn) as db:
+        numeric = backfill_numeric_columns(db)
+        end_times = backfill_end_times(db)
+    print(f"Backfilled numeric price/bid columns for {numeric} auctions, end times for {end_times}")
+
+# Migration 1 builds from the current models, so a fresh database already
+# has every table, column and index later steps add, then runs them anyway.
+# Every migration after 1 must therefore be idempotent: add columns only if
+# missing, create indexes with if_not_exists, and write backfills that are
+# no-ops on rows already filled. Append new steps; never edit applied ones.
+MIGRATIONS: List[Migration] = [
+    Migration(1, "baseline tables and legacy columns", _baseline),
+    Migration(2, "indexes for list, opportunity, refresh and job queries", _create_indexes),
+    Migration(3, "backfill numeric price/bid columns and end times", _backfill),
+]
+LATEST_VERSION = MIGRATIONS[-1].version
+
+def _add_missing_columns(conn: Connection, table: Table):
+    existing = {column['name'] for column in inspect(conn).get_columns(table.name)}
+    quote = conn.dialect.identifier_preparer.quote
+    for column in table.columns:
+        if column.name in existing:
+            continue
+        ddl = f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} {column.type.compile(dialect=conn.dialect)}"
+        default = column.default.arg if column.default is not None and column.default.is_scalar else None
+        if isinstance(default, bool):
+            ddl += " DEFAULT TRUE" if default else " DEFAULT FALSE"
+        conn.execute(text(ddl))
+        print(f"Added column: {table.name}.{column.name}")
+
+def current_version(conn: Connection) -> int:
+    """
+    Highest applied migration version; 0 for a database that has never been migrated
+    """
+    try:
+        version = conn.execute(select(schema_migrations.c.version).order_by(schema_migrations.c.version.desc()).limit(1)).scalar()
+    except DBAPIError:
+        # No version table yet
+        conn.rollback()
+        return 0
+    conn.commit()
+    return version or 0
+
+def migrate(bind: Engine = engine, target: int = LATEST_VERSION) -> List[int]:
+    """
+    Apply pending migrations up to target. Returns the versions applied.
+    """
+    with bind.connect() as conn:
+        if current_version(conn) >= target:
+            return []
+
+        is_postgres = conn.dialect.name == 'postgresql'
+        if is_postgres:
+            # Waiting for the lock and building indexes can outlast DB_STATEMENT_TIMEOUT_MS
+            conn.execute(text("SET statement_timeout = 0"))
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": LOCK_KEY})
+            conn.commit()
+        try:
+            schema_migrations.create(conn, checkfirst=True)
+            conn.commit()
+
+            # Another process may have migrated while we waited for the lock
+            version = current_version(conn)
+            applied = []
+            for migration in MIGRATIONS:
+                if migration.version <= version or migration.version > target:
+                    continue
+                print(f"Applying migration {migration.version}: {migration.name}")
+                try:
+                    migration.apply(conn)
+                    conn.execute(insert(schema_migrations).values(
+                        version=migration.version,
+                        name=migration.name,
+                        applied_at=datetime.now(timezone.utc)
+                    ))
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                applied.append(migration.version)
+            return applied
+        finally:
+            if is_postgres:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": LOCK_KEY})
+                conn.execute(text("RESET statement_timeout"))
+                conn.commit()
+
+def startup_migrate(bind: Engine = engine):
+    """
+    Called once per process at startup: migrates if AUTO_MIGRATE is on,
+    otherwise only warns when the schema is behind
+    """
+    if AUTO_MIGRATE:
+        applied = migrate(bind)
+        if applied:
+            print(f"Applied migrations: {applied}")
+        return
+
+    with bind.connect() as conn:
+        version = current_version(conn)
+    if version < LATEST_VERSION:
+        print(f"WARNING: database schema is at version {version}, expected {LATEST_VERSION}; "
+              f"run 'python -m app.migrations upgrade'")
+
+def main(argv: List[str]) -> int:
+    command = argv[0] if argv else "upgrade"
+    if command == "upgrade":
+        applied = migrate()
+        print(f"Applied migrations: {applied}" if applied else f"Already at version {LATEST_VERSION}")
+    elif command == "current":
+        with engine.connect() as conn:
+            print(current_version(conn))
+    elif command == "history":
+        with engine.connect() as conn:
+            version = current_version(conn)
+        for migration in MIGRATIONS:
+            state = "applied" if migration.version <= version else "pending"
+            print(f"{migration.version:>4}  {state:<8} {migration.name}")
+    else:
+        print(f"Unknown command '{command}', expected upgrade, current or history")
+        return 2
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,6 +1,12 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, Text, JSON
+from sqlalchemy import Column, Integer, String, Float, Boolean, Text, JSON, Index, DateTime
 from app.database import Base
 
+# An auction is an opportunity when its estimated value exceeds this multiple of the current price
+OPPORTUNITY_RATIO = 1.5
+
+# Appraisal confidence levels, lowest first
+CONFIDENCE_LEVELS = ["low", "medium", "high"]
+
 class Auction(Base):
     __tablename__ = "auctions"
 
@@ -19,4 +25,26 @@ class Auction(Base):
     num_bids = Column(String, nullable=True)
     seller = Column(String, nullable=True)
     item_details = Column(JSON, nullable=True)  # Store various details as JSON
-    details_scraped = Column(Boolean, default=False)  # Track if we've scraped details 
\ No newline at end of file
+    details_scraped = Column(Boolean, default=False)  # Track if we've scraped details
+
+    # Numeric versions of price/num_bids, parsed at ingest so queries can filter in SQL
+    price_value = Column(Float, nullable=True)
+    bid_count = Column(Integer, nullable=True)
+
+    # Structured appraisal fields from the analysis response
+    value_confidence = Column(String, nullable=True, index=True)  # low / medium / high
+    condition_grade = Column(String, nullable=True)  # Mint ... Poor, or Unknown
+    condition_notes = Column(Text, nullable=True)
+    item_breakdown = Column(JSON, nullable=True)  # [{description, value, source}]
+
+    # When bidding closes, and when price/bids were last re-scraped; drive the refresh queue
+    ends_at = Column(DateTime(timezone=True), nullable=True, index=True)
+    refreshed_at = Column(DateTime(timezone=True), nullable=True, index=True)
+
+    __table_args__ = (
+        # Expression indexes matching the /opportunities filter and sort
+        Index('ix_auctions_opportunity_excess', estimated_value - OPPORTUNITY_RATIO * price_value),
+        Index('ix_auctions_margin', estimated_value - price_value),
+        # /auctions?watchlisted= pages in id order; the refresh queue scans watchlisted rows
+        Index('ix_auctions_watchlisted_id', is_watchlisted, id),
+    )
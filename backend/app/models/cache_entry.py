@@ -0,0 +1,15 @@
+from datetime import datetime, timezone
+from sqlalchemy import Column, String, JSON, DateTime
+from app.database import Base
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+class CacheEntry(Base):
+    __tablename__ = "cache_entries"
+
+    # sha256 of the namespace and normalized request
+    key = Column(String(64), primary_key=True)
+    namespace = Column(String, index=True)
+    value = Column(JSON)
+    fetched_at = Column(DateTime(timezone=True), default=_utcnow, index=True)
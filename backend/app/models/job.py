@@ -0,0 +1,38 @@
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, Text, JSON, DateTime, Index
+from app.database import Base
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_PARTIAL = "partial"  # finished, but some auctions failed
+JOB_FAILED = "failed"
+JOB_FINISHED_STATUSES = (JOB_SUCCEEDED, JOB_PARTIAL, JOB_FAILED)
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(String(32), primary_key=True, default=lambda: uuid.uuid4().hex)
+    kind = Column(String, default="analyze")
+    status = Column(String, default=JOB_QUEUED, index=True)
+    auction_ids = Column(JSON)
+    total = Column(Integer, default=0)
+    completed = Column(Integer, default=0)
+    failed = Column(Integer, default=0)
+    results = Column(JSON, nullable=True)  # {auction_id: {"status": ..., ...}}
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), default=_utcnow, index=True)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    # Refreshed as a worker makes progress; a stale heartbeat means the worker died
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Workers claim the oldest queued job
+        Index('ix_jobs_status_created_at', status, created_at),
+    )
@@ -0,0 +1,21 @@
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, JSON, DateTime, ForeignKey, UniqueConstraint
+from app.database import Base
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+class ResearchSnapshot(Base):
+    __tablename__ = "research_snapshots"
+
+    id = Column(Integer, primary_key=True)
+    auction_id = Column(Integer, ForeignKey("auctions.id", ondelete="CASCADE"), nullable=False, index=True)
+    version = Column(Integer, nullable=False)  # 1, 2, ... per auction
+    title = Column(String)  # auction title the research was run for
+    data = Column(JSON)  # research_item_value output
+    sources = Column(JSON)  # {"answered": [...], "missing": [...]}
+    created_at = Column(DateTime(timezone=True), default=_utcnow, index=True)
+
+    __table_args__ = (
+        UniqueConstraint('auction_id', 'version', name='uq_research_snapshots_auction_version'),
+    )
@@ -0,0 +1,22 @@
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, Text, JSON, DateTime
+from app.database import Base
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+class SchedulerTask(Base):
+    """
+    Persisted state of one recurring scheduler task, shared by every process
+    """
+    __tablename__ = "scheduler_tasks"
+
+    name = Column(String(64), primary_key=True)
+    # A process claims a run by moving next_run_at forward while it is due
+    next_run_at = Column(DateTime(timezone=True), default=_utcnow)
+    last_started_at = Column(DateTime(timezone=True), nullable=True)
+    last_finished_at = Column(DateTime(timezone=True), nullable=True)
+    last_status = Column(String, nullable=True)  # succeeded / failed
+    last_error = Column(Text, nullable=True)
+    last_result = Column(JSON, nullable=True)
+    runs = Column(Integer, default=0)
@@ -1,21 +1,99 @@
 import os
+import hashlib
+import json
+from contextlib import nullcontext
+from typing import Callable, ContextManager
 from openai import OpenAI
 from dotenv import load_dotenv
-import re
+from app.models.auction import CONFIDENCE_LEVELS
 from app.services.price_research import price_research
+from app.services.research_cache import analysis_cache
+from app.services.image_store import prepare_images
 
 load_dotenv()
 
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
-def analyze_auction_item(title: str, image_url: str, description: str = None, all_images: list = None, current_price: str = None) -> tuple[float, str]:
+ANALYSIS_MODEL = "gpt-4o"
+ANALYSIS_MAX_TOKENS = 4000
+
+ANALYSIS_SYSTEM_PROMPT = """You are an expert auction appraiser who helps buyers determine fair prices at auctions. 
+
+CRITICAL: Respond in the requested JSON format. estimated_value must ALWAYS be a single number - the maximum amount someone should bid/pay for this auction RIGHT NOW. This is NOT the retail value, but what makes sense to pay at auction considering:
+- Current market prices from actual sold listings
+- Condition relative to comparables
+- Resale potential with specific platform recommendations
+- Competition from other bidders
+
+You must analyze EVERY item visible in photos, even background items, and provide individual valuations with source citations in the items field. Reference specific eBay sold listings, web prices, and market trends. Put your full written analysis in the analysis field. Be extremely detailed and thorough in your analysis."""
+
+CONDITION_GRADES = ["Mint", "Near Mint", "Excellent", "Very Good", "Good", "Fair", "Poor", "Unknown"]
+
+# Structured Outputs schema for the appraisal; strict mode needs every field required
+APPRAISAL_SCHEMA = {
+    "name": "auction_appraisal",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "additionalProperties": False,
+        "required": ["estimated_value", "confidence", "condition", "items", "analysis"],
+        "properties": {
+            "estimated_value": {
+                "type": "number",
+                "description": "Maximum amount in USD to pay for this auction right now (not retail value)"
+            },
+            "confidence": {"type": "string", "enum": CONFIDENCE_LEVELS},
+            "condition": {
+                "type": "object",
+                "additionalProperties": False,
+                "required": ["grade", "notes"],
+                "properties": {
+                    "grade": {"type": "string", "enum": CONDITION_GRADES},
+                    "notes": {"type": "string", "description": "Visible flaws, repairs and completeness"}
+                }
+            },
+            "items": {
+                "type": "array",
+                "description": "Every visible item in the lot with its individual value",
+                "items": {
+                    "type": "object",
+                    "additionalProperties": False,
+                    "required": ["description", "value", "source"],
+                    "properties": {
+                        "description": {"type": "string"},
+                        "value": {"type": "number"},
+                        "source": {"type": "string", "description": "Where the value comes from, e.g. eBay sold listing avg"}
+                    }
+                }
+            },
+            "analysis": {
+                "type": "string",
+                "description": "The full written analysis, following the requested sections"
+            }
+        }
+    }
+}
+
+def analyze_auction_item(title: str, image_url: str, description: str = None, all_images: list = None, current_price: str = None, market_data: dict = None, force_refresh: bool = False, on_token: Callable[[str], None] = None, model_slot: ContextManager = None) -> tuple[float | None, str, dict]:
     """
-    Analyze an auction item using GPT-4o with all available information and market research
+    Analyze an auction item using GPT-4o with all available information and market research.
+    Pass market_data to reuse research already done by the caller.
+    Identical requests (same prompt, images and model) are answered from the
+    response cache unless force_refresh is set.
+    Returns (estimated_value, analysis, appraisal) where appraisal holds the
+    structured fields (value_confidence, condition_grade, condition_notes,
+    item_breakdown).
+    on_token receives the model output as it streams in (all at once when
+    it comes from the cache). model_slot, if given, is held only around the
+    model request, after the images are prepared. Raises if the analysis can't be produced,
+    including when the model's answer is truncated, isn't JSON or has no
+    usable value.
     """
     try:
         # First, conduct market research
-        print(f"Conducting market research for: {title}")
-        market_data = price_research.research_item_value(title, description)
+        if market_data is None:
+            print(f"Conducting market research for: {title}")
+            market_data = price_research.research_item_value(title, description)
         
         # Parse current price if available
         current_price_text = current_price if current_price else "Unknown"
@@ -27,7 +105,7 @@ def analyze_auction_item(title: str, image_url: str, description: str = None, al
                 "text": f"""Analyze this auction item with EXTREME attention to detail:
 
 CRITICAL INSTRUCTIONS FOR VALUATION:
-1. FIRST LINE MUST BE: A single number representing what someone should pay for this auction RIGHT NOW (e.g., 125.50)
+1. estimated_value MUST BE: A single number representing what someone should pay for this auction RIGHT NOW (e.g., 125.50)
    - This is the CURRENT AUCTION VALUE, not retail price
    - Current bidding price: {current_price_text}
    - If worth less than current price, suggest lower
@@ -35,9 +113,9 @@ CRITICAL INSTRUCTIONS FOR VALUATION:
 
 2. EXTREMELY DETAILED ANALYSIS WITH CITATIONS:
 
-ITEM-BY-ITEM BREAKDOWN (REQUIRED):
+ITEM-BY-ITEM BREAKDOWN (REQUIRED, in the items field):
 - List EVERY visible item with individual values
-- Format: "Item 1: [Description] - Value: $XX (Source: eBay sold listing avg)"
+- Each item: description, value, and source (e.g. "eBay sold listing avg")
 - Include items visible in background/partially shown
 - Total lot value = sum of all items
 - CITE YOUR SOURCES for each value estimate
@@ -57,7 +135,7 @@ DETAILED VISUAL INSPECTION:
 - Check for rare variations, errors, or unique features
 - Compare condition to sold listings
 
-CONDITION ASSESSMENT:
+CONDITION ASSESSMENT (grade and notes in the condition field):
 - Rate condition on standard scale (Mint/Near Mint/Excellent/Very Good/Good/Fair/Poor)
 - List ALL visible flaws: scratches, chips, tears, stains, missing parts
 - Note any repairs, restorations, or modifications
@@ -90,72 +168,40 @@ Current Auction Price: {current_price_text}"""
         if description:
             content_parts[0]["text"] += f"\n\nDescription from seller:\n{description[:1000]}..."  # Limit description length
         
-        # Add main image
-        content_parts.append({
-            "type": "image_url",
-            "image_url": {"url": image_url}
-        })
+        # Keyed on the prompt text and image URLs, before any image is downloaded
+        image_urls = [image_url] + (all_images or [])[:5]
+        request_key = _request_key(content_parts[0]["text"], image_urls)
         
-        # Add additional images if available (limit to 5 to avoid token limits)
-        if all_images:
-            for img_url in all_images[:5]:
-                if img_url != image_url:  # Don't duplicate the main image
-                    content_parts.append({
-                        "type": "image_url",
-                        "image_url": {"url": img_url}
-                    })
-        
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {
-                    "role": "system",
-                    "content": """You are an expert auction appraiser who helps buyers determine fair prices at auctions. 
-
-CRITICAL: The FIRST LINE of your response must ALWAYS be a single number - the maximum amount someone should bid/pay for this auction RIGHT NOW. This is NOT the retail value, but what makes sense to pay at auction considering:
-- Current market prices from actual sold listings
-- Condition relative to comparables
-- Resale potential with specific platform recommendations
-- Competition from other bidders
-
-You must analyze EVERY item visible in photos, even background items, and provide individual valuations with source citations. Reference specific eBay sold listings, web prices, and market trends. Be extremely detailed and thorough in your analysis."""
-                },
-                {
-                    "role": "user",
-                    "content": content_parts
-                }
-            ],
-            max_tokens=4000,  # Doubled from 2000
-        )
-        
-        content = response.choices[0].message.content.strip()
-        lines = content.split('\n')
-        
-        # Extract the numeric value from the first line
-        estimated_value = None
-        value_line = lines[0] if lines else ""
+        messages = [
+            {
+                "role": "system",
+                "content": ANALYSIS_SYSTEM_PROMPT
+            },
+            {
+                "role": "user",
+                "content": content_parts
+            }
+        ]
         
-        # Try to find a number in the first line
-        number_match = re.search(r'(\d+\.?\d*)', value_line)
-        if number_match:
-            try:
-                estimated_value = float(number_match.group(1))
-            except ValueError:
-                pass
+        streamed = []
         
-        # If we couldn't find a value, use market research average
-        if estimated_value is None and market_data['price_summary'].get('average_value'):
-            estimated_value = market_data['price_summary']['average_value']
+        def complete():
+            streamed.append(True)
+            # Main image plus up to 5 more, fetched once, deduplicated, resized and inlined
+            content_parts.extend(prepare_images(image_urls))
+            with model_slot or nullcontext():
+                return _complete(messages, on_token)
         
-        # If still no value, use a default
-        if estimated_value is None:
-            estimated_value = 25.0  # Default fallback value
-            
-        # Get the analysis (everything after the first line, or the entire content if no clear separation)
-        if len(lines) > 1:
-            analysis = "\n".join(lines[1:]).strip()
-        else:
-            analysis = content
+        # Only complete, schema-valid answers with a value are cached
+        content = analysis_cache.get_or_fetch(
+            [request_key], complete, cacheable=_is_usable_response, force=force_refresh
+        )
+        if on_token and not streamed:
+            on_token(content)
+        if not _is_usable_response(content):
+            # Saving a truncated or non-JSON answer would wipe the stored analysis and estimate
+            raise ValueError(f"Unusable analysis response for '{title}': {content[:200]!r}")
+        estimated_value, analysis, appraisal = _parse_appraisal(content)
             
         # Append market insights to analysis
         if market_data['market_insights']:
@@ -165,21 +211,110 @@ You must analyze EVERY item visible in photos, even background items, and provid
             analysis += f"\n\n💰 Pricing Recommendations:\n"
             analysis += f"• List Price: {market_data['recommendations']['list_price']}\n"
             analysis += f"• Accept Offers Above: {market_data['recommendations']['accept_offers_above']}\n"
-            analysis += f"• Quick Sale Price: {market_data['recommendations']['quick_sale_price']}\n"
+            # Limited-data recommendations have no quick sale price
+            if market_data['recommendations'].get('quick_sale_price'):
+                analysis += f"• Quick Sale Price: {market_data['recommendations']['quick_sale_price']}\n"
             analysis += f"• Strategy: {market_data['recommendations']['strategy']}"
         
         # Ensure we have some analysis text
-        if not analysis or analysis == str(estimated_value):
-            analysis = f"Collectible item: {title}. Estimated value based on general market conditions."
+        if not analysis:
+            analysis = f"Collectible item: {title}. No written analysis was returned."
         
-        print(f"Analyzed '{title}': Value=${estimated_value}, Analysis length={len(analysis)}, Images analyzed={1 + len(all_images) if all_images else 1}")
+        print(f"Analyzed '{title}': Value=${estimated_value}, Confidence={appraisal['value_confidence']}, Analysis length={len(analysis)}, Images analyzed={1 + len(all_images) if all_images else 1}")
         
-        return estimated_value, analysis
+        return estimated_value, analysis, appraisal
         
     except Exception as e:
         print(f"Error during OpenAI API call: {e}")
-        # Return reasonable defaults
-        return 25.0, f"Analysis unavailable. Error: {str(e)}"
+        # Callers record a failed item and keep the auction's stored analysis
+        raise
+
+def _complete(messages: list, on_token: Callable[[str], None] = None) -> str:
+    request = dict(
+        model=ANALYSIS_MODEL,
+        messages=messages,
+        max_tokens=ANALYSIS_MAX_TOKENS,
+        response_format={"type": "json_schema", "json_schema": APPRAISAL_SCHEMA},
+    )
+    if on_token is None:
+        response = client.chat.completions.create(**request)
+        return response.choices[0].message.content.strip()
+
+    chunks = []
+    for chunk in client.chat.completions.create(**request, stream=True):
+        text = chunk.choices[0].delta.content if chunk.choices else None
+        if text:
+            chunks.append(text)
+            on_token(text)
+    return ''.join(chunks).strip()
+
+def _empty_appraisal() -> dict:
+    return {'value_confidence': None, 'condition_grade': None, 'condition_notes': None, 'item_breakdown': None}
+
+def _parse_appraisal(content: str) -> tuple[float | None, str, dict]:
+    """
+    Read the structured response. Fields that are missing or malformed come
+    back as None; a response that isn't JSON is kept as the analysis text.
+    """
+    appraisal = _empty_appraisal()
+    try:
+        data = json.loads(content)
+    except ValueError:
+        return None, content, appraisal
+    if not isinstance(data, dict):
+        return None, content, appraisal
+
+    estimated_value = data.get('estimated_value')
+    if isinstance(estimated_value, (int, float)) and not isinstance(estimated_value, bool) and estimated_value >= 0:
+        estimated_value = float(estimated_value)
+    else:
+        estimated_value = None
+
+    if data.get('confidence') in CONFIDENCE_LEVELS:
+        appraisal['value_confidence'] = data['confidence']
+    condition = data.get('condition') if isinstance(data.get('condition'), dict) else {}
+    if condition.get('grade') in CONDITION_GRADES:
+        appraisal['condition_grade'] = condition['grade']
+    appraisal['condition_notes'] = condition.get('notes') or None
+    if isinstance(data.get('items'), list):
+        appraisal['item_breakdown'] = [
+            {'description': item.get('description'), 'value': item.get('value'), 'source': item.get('source')}
+            for item in data['items'] if isinstance(item, dict)
+        ]
+
+    return estimated_value, (data.get('analysis') or '').strip(), appraisal
+
+def _is_usable_response(content: str) -> bool:
+    """
+    True when a response parses as JSON with every field APPRAISAL_SCHEMA
+    requires and a usable estimated_value; truncated or malformed answers
+    aren't worth caching
+    """
+    try:
+        data = json.loads(content)
+    except (TypeError, ValueError):
+        return False
+    if not isinstance(data, dict):
+        return False
+    if any(field not in data for field in APPRAISAL_SCHEMA["schema"]["required"]):
+        return False
+    return _parse_appraisal(content)[0] is not None
+
+def _request_key(prompt: str, image_urls: list) -> str:
+    """
+    Content hash of a completion request: model, token limit, schema, system
+    prompt, the user prompt with whitespace collapsed (title, description,
+    price and research) and the listing image URLs
+    """
+    payload = {
+        "model": ANALYSIS_MODEL,
+        "max_tokens": ANALYSIS_MAX_TOKENS,
+        "response_format": APPRAISAL_SCHEMA,
+        "system": ' '.join(ANALYSIS_SYSTEM_PROMPT.split()),
+        "prompt": ' '.join(prompt.split()),
+        "images": [url for url in image_urls if url]
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
 
 def _format_market_research(market_data: dict) -> str:
     """
@@ -267,7 +402,8 @@ def _format_detailed_market_research(market_data: dict) -> str:
         research_text.append(f"\n🎯 SELLING RECOMMENDATIONS:")
         research_text.append(f"- Suggested list price: {market_data['recommendations']['list_price']}")
         research_text.append(f"- Accept offers above: {market_data['recommendations']['accept_offers_above']}")
-        research_text.append(f"- Quick sale price: {market_data['recommendations']['quick_sale_price']}")
+        if market_data['recommendations'].get('quick_sale_price'):
+            research_text.append(f"- Quick sale price: {market_data['recommendations']['quick_sale_price']}")
         research_text.append(f"- Strategy: {market_data['recommendations']['strategy']}")
     
     return '\n'.join(research_text) if research_text else "No market data available" 
\ No newline at end of file
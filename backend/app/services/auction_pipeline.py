@@ -0,0 +1,200 @@
+import os
+import threading
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from app.database import SessionLocal
+from app.models.auction import Auction
+from app.services.analysis import analyze_auction_item
+from app.services.detail_scraper import scrape_auction_details
+from app.services.research_snapshots import get_research
+from app.services.screening import screen_listings, SCREEN_BATCH_SIZE
+from app.services.utils import parse_bid_count, parse_price, parse_end_time
+
+load_dotenv()
+
+# Analyses in flight at once, and per-stage limits shared by every job in the process
+TASK_CONCURRENCY = int(os.getenv("ANALYZE_CONCURRENCY", "8"))
+scrape_limit = threading.BoundedSemaphore(int(os.getenv("ANALYZE_SCRAPE_CONCURRENCY", "2")))
+research_limit = threading.BoundedSemaphore(int(os.getenv("ANALYZE_RESEARCH_CONCURRENCY", "4")))
+llm_limit = threading.BoundedSemaphore(int(os.getenv("ANALYZE_LLM_CONCURRENCY", "3")))
+
+_executor = ThreadPoolExecutor(max_workers=TASK_CONCURRENCY, thread_name_prefix="analysis")
+
+def apply_details(db_auction: Auction, details: dict):
+    """
+    Copy scraped detail fields onto an auction and mark it as scraped and
+    refreshed now
+    """
+    if 'description_text' in details:
+        db_auction.description = details['description_text']
+    if 'all_images' in details:
+        db_auction.all_images = details['all_images']
+    if 'current_price' in details:
+        db_auction.price = details['current_price']
+        db_auction.price_value = parse_price(details['current_price'])
+    if 'num_bids' in details:
+        db_auction.num_bids = details['num_bids']
+        db_auction.bid_count = parse_bid_count(details['num_bids'])
+    if 'seller' in details:
+        db_auction.seller = details['seller']
+    if 'item_details' in details:
+        db_auction.item_details = details['item_details']
+    if details.get('end_time'):
+        db_auction.ends_at = parse_end_time(details['end_time']) or db_auction.ends_at
+
+    db_auction.details_scraped = True
+    db_auction.refreshed_at = datetime.now(timezone.utc)
+
+def run_analysis(auction_id: int, force_refresh: bool = False, on_event: Callable[[str, Dict], None] = None) -> Dict | None:
+    """
+    Scrape details (first time only), research (reusing a fresh research
+    snapshot) and analyze one auction
+    without holding a database connection during the slow steps.
+    Reads the auction through its own short-lived session, so it is safe to
+    run from any thread. Returns None if the auction doesn't exist; the
+    result is written back with apply_analysis. force_refresh bypasses the
+    cached model response. on_event(event, data), if given, is called as
+    each stage progresses (see analyze_auction_stream in main).
+    """
+    emit = on_event or (lambda event, data: None)
+    with SessionLocal() as db:
+        db_auction = db.get(Auction, auction_id)
+        if not db_auction:
+            return None
+        auction = {
+            'title': db_auction.title,
+            'image_url': db_auction.image_url,
+            'auction_url': db_auction.auction_url,
+            'price': db_auction.price,
+            'description': db_auction.description,
+            'all_images': db_auction.all_images,
+            'details_scraped': db_auction.details_scraped
+        }
+
+    details = None
+    if not auction['details_scraped']:
+        print(f"Scraping detailed information for auction {auction_id}")
+        with scrape_limit:
+            details = scrape_auction_details(auction['auction_url'])
+        if details:
+            auction['description'] = details.get('description_text', auction['description'])
+            auction['all_images'] = details.get('all_images', auction['all_images'])
+        emit('stage', {'stage': 'details', 'status': 'scraped' if details else 'failed'})
+    else:
+        emit('stage', {'stage': 'details', 'status': 'cached'})
+
+    with research_limit:
+        print(f"Conducting market research for: {auction['title']}")
+        market_data, snapshot = get_research(
+            auction_id,
+            auction['title'],
+            auction['description'],
+            on_source=lambda source, result: emit('source', {'source': source, 'results': result})
+        )
+    emit('stage', {
+        'stage': 'research',
+        'status': 'cached' if snapshot['reused'] else 'done',
+        'snapshot_version': snapshot['version'],
+        'price_summary': market_data['price_summary'],
+        'market_insights': market_data['market_insights']
+    })
+
+    print(f"Analyzing auction {auction_id} with {len(auction['all_images']) if auction['all_images'] else 1} images")
+    emit('stage', {'stage': 'model', 'status': 'started'})
+    # Image downloads happen before the llm_limit slot is taken, so they don't hold it
+    estimated_value, analysis, appraisal = analyze_auction_item(
+        auction['title'],
+        auction['image_url'],
+        description=auction['description'],
+        all_images=auction['all_images'],
+        current_price=auction['price'],
+        market_data=market_data,
+        force_refresh=force_refresh,
+        on_token=(lambda text: emit('token', {'text': text})) if on_event else None,
+        model_slot=llm_limit
+    )
+
+    return {
+        'id': auction_id,
+        'details': details,
+        'estimated_value': estimated_value,
+        'analysis': analysis,
+        'appraisal': appraisal
+    }
+
+def apply_analysis(db_auction: Auction, result: Dict):
+    if result['details']:
+        apply_details(db_auction, result['details'])
+    db_auction.estimated_value = result['estimated_value']
+    db_auction.analysis = result['analysis']
+    for field, value in result['appraisal'].items():
+        setattr(db_auction, field, value)
+
+def run_analyses(auction_ids: List[int], force_refresh: bool = False) -> Dict[int, Dict | None | Exception]:
+    """
+    Run run_analysis for many auctions in parallel (bounded by the stage limits).
+    Maps each id to its result, None if it doesn't exist, or the exception raised.
+    """
+    futures = {auction_id: _executor.submit(run_analysis, auction_id, force_refresh) for auction_id in auction_ids}
+    outcomes = {}
+    for auction_id, future in futures.items():
+        try:
+            outcomes[auction_id] = future.result()
+        except Exception as e:
+            print(f"Error analyzing auction {auction_id}: {e}")
+            outcomes[auction_id] = e
+    return outcomes
+
+def run_screening(auction_ids: List[int], batch_size: int = SCREEN_BATCH_SIZE) -> Dict[int, Dict | Exception]:
+    """
+    First-pass screen of many auctions, several per model request, with
+    batches running in parallel under the LLM limit.
+    Maps each id to {screen_value, promoted, reason} or the exception that
+    failed it; ids that don't exist are left out.
+    """
+    with SessionLocal() as db:
+        listings = [
+            {'id': row.id, 'title': row.title, 'price': row.price, 'price_value': row.price_value, 'image_url': row.image_url}
+            for row in db.query(
+                Auction.id, Auction.title, Auction.price, Auction.price_value, Auction.image_url
+            ).filter(Auction.id.in_(auction_ids))
+        ]
+
+    def screen(batch):
+        with llm_limit:
+            return screen_listings(batch)
+
+    batches = [listings[i:i + batch_size] for i in range(0, len(listings), batch_size)]
+    futures = [(batch, _executor.submit(screen, batch)) for batch in batches]
+    outcomes = {}
+    for batch, future in futures:
+        try:
+            screened = future.result()
+        except Exception as e:
+            print(f"Error screening {len(batch)} auctions: {e}")
+            screened = {}
+            error = e
+        else:
+            error = ValueError("Missing from screening response")
+        for listing in batch:
+            outcomes[listing['id']] = screened.get(listing['id'], error)
+    return outcomes
+
+def analyze_auction_by_id(db: Session, auction_id: int, force_refresh: bool = False, on_event: Callable[[str, Dict], None] = None) -> Auction | None:
+    """
+    Analyze one auction and save the result.
+    Returns None if the auction doesn't exist; other failures raise.
+    """
+    result = run_analysis(auction_id, force_refresh, on_event)
+    if result is None:
+        return None
+
+    db_auction = db.get(Auction, auction_id)
+    apply_analysis(db_auction, result)
+    db.commit()
+    db.refresh(db_auction)
+
+    return db_auction
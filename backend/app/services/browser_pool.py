@@ -0,0 +1,226 @@
+import os
+import queue
+import threading
+import time
+import atexit
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Callable, Dict, Optional, Any
+from playwright.sync_api import sync_playwright
+from dotenv import load_dotenv
+from app.services.resource_filter import ResourceFilter
+
+load_dotenv()
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+LAUNCH_ARGS = ['--disable-blink-features=AutomationControlled']
+# Longest a caller waits on run() before giving up on its page
+RUN_TIMEOUT = float(os.getenv("BROWSER_RUN_TIMEOUT", "180"))
+
+class BrowserPool:
+    """
+    Long-lived pool of headless Chromium workers shared by the scrapers.
+
+    Playwright's sync API is bound to the thread that started it, so each
+    worker thread owns its own browser and context and callers hand work to
+    the pool as a callable that receives a fresh page.
+    """
+
+    def __init__(self, size: int = 2, max_context_uses: int = 20):
+        self.size = size
+        self.max_context_uses = max_context_uses
+        self._jobs = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._started = False
+
+        # Metrics
+        self._busy = 0
+        self._jobs_completed = 0
+        self._jobs_failed = 0
+        self._contexts_recycled = 0
+        self._browser_launches = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def start(self, warm: bool = False, warm_timeout: float = 60):
+        """
+        Start the worker threads (no-op if the pool is already running).
+        With warm, each worker launches its browser straight away and this
+        waits up to warm_timeout for them, so the first job doesn't pay for
+        the launch; otherwise browsers launch on first use.
+        """
+        with self._lock:
+            if self._started:
+                return
+            ready = [threading.Event() for _ in range(self.size)] if warm else [None] * self.size
+            self._threads = [
+                threading.Thread(target=self._worker, args=(ready[i],), name=f"browser-pool-{i}", daemon=True)
+                for i in range(self.size)
+            ]
+            for thread in self._threads:
+                thread.start()
+            self._started = True
+
+        if warm:
+            deadline = time.monotonic() + warm_timeout
+            for event in ready:
+                event.wait(max(0, deadline - time.monotonic()))
+            print(f"Browser pool started with {self.size} workers, {self.metrics()['browser_launches']} browsers warm")
+        else:
+            print(f"Browser pool started with {self.size} workers")
+
+    def shutdown(self, timeout: float = 30):
+        """
+        Stop all workers, closing their contexts and browsers
+        """
+        with self._lock:
+            if not self._started:
+                return
+            threads = self._threads
+            self._threads = []
+            self._started = False
+
+        for _ in threads:
+            self._jobs.put(None)
+        for thread in threads:
+            thread.join(timeout=timeout)
+        print("Browser pool shut down")
+
+    def run(self, fn: Callable[[Any], Any], timeout: Optional[float] = RUN_TIMEOUT) -> Any:
+        """
+        Run fn(page) on a pooled browser and return its result.
+        The page is closed afterwards; exceptions from fn are re-raised here.
+        Raises TimeoutError if the result takes longer than timeout seconds,
+        counting time spent queued (None waits forever).
+        """
+        self.start()
+        future = Future()
+        self._jobs.put((fn, future, time.monotonic()))
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeout:
+            # Drop it if still queued; a page already running can't be interrupted from here
+            future.cancel()
+            raise TimeoutError(f"Browser job did not finish within {timeout}s")
+
+    def metrics(self) -> Dict:
+        """
+        Snapshot of pool size, utilisation and queue wait times
+        """
+        with self._lock:
+            served = self._jobs_completed + self._jobs_failed
+            return {
+                'size': self.size,
+                'running': self._started,
+                'busy': self._busy,
+                'queued': self._jobs.qsize(),
+                'jobs_completed': self._jobs_completed,
+                'jobs_failed': self._jobs_failed,
+                'contexts_recycled': self._contexts_recycled,
+                'browser_launches': self._browser_launches,
+                'avg_wait_seconds': round(self._total_wait / served, 3) if served else 0.0,
+                'max_wait_seconds': round(self._max_wait, 3)
+            }
+
+    def _worker(self, ready: Optional[threading.Event] = None):
+        playwright = None
+        browser = None
+        context = None
+        uses = 0
+
+        try:
+            if ready is not None:
+                try:
+                    playwright = sync_playwright().start()
+                    browser = playwright.chromium.launch(headless=True, args=LAUNCH_ARGS)
+                    with self._lock:
+                        self._browser_launches += 1
+                except Exception as e:
+                    # Retried on first use
+                    print(f"Error warming browser: {e}")
+                finally:
+                    ready.set()
+
+            while True:
+                job = self._jobs.get()
+                if job is None:
+                    break
+
+                fn, future, enqueued_at = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+
+                wait = time.monotonic() - enqueued_at
+                with self._lock:
+                    self._busy += 1
+                    self._total_wait += wait
+                    self._max_wait = max(self._max_wait, wait)
+
+                try:
+                    if playwright is None:
+                        playwright = sync_playwright().start()
+                    if browser is None or not browser.is_connected():
+                        # First use, or the previous browser crashed
+                        context = None
+                        browser = playwright.chromium.launch(headless=True, args=LAUNCH_ARGS)
+                        with self._lock:
+                            self._browser_launches += 1
+                    if context is None:
+                        context = browser.new_context(user_agent=USER_AGENT)
+                        uses = 0
+
+                    page = context.new_page()
+                    resource_filter = ResourceFilter()
+                    resource_filter.attach(page)
+                    try:
+                        result = fn(page)
+                    finally:
+                        resource_filter.report(page.url)
+                        _close_quietly(page)
+
+                    uses += 1
+                    future.set_result(result)
+                    with self._lock:
+                        self._jobs_completed += 1
+                except Exception as e:
+                    future.set_exception(e)
+                    with self._lock:
+                        self._jobs_failed += 1
+                    # Don't trust a context that just failed; start clean next time
+                    if context is not None:
+                        _close_quietly(context)
+                        context = None
+                        with self._lock:
+                            self._contexts_recycled += 1
+                finally:
+                    with self._lock:
+                        self._busy -= 1
+
+                if context is not None and uses >= self.max_context_uses:
+                    _close_quietly(context)
+                    context = None
+                    with self._lock:
+                        self._contexts_recycled += 1
+        finally:
+            _close_quietly(context)
+            _close_quietly(browser)
+            if playwright is not None:
+                try:
+                    playwright.stop()
+                except Exception as e:
+                    print(f"Error stopping Playwright: {e}")
+
+def _close_quietly(resource):
+    if resource is None:
+        return
+    try:
+        resource.close()
+    except Exception as e:
+        print(f"Error closing browser resource: {e}")
+
+# Singleton instance
+browser_pool = BrowserPool(
+    size=int(os.getenv("BROWSER_POOL_SIZE", "2")),
+    max_context_uses=int(os.getenv("BROWSER_CONTEXT_MAX_USES", "20"))
+)
+atexit.register(browser_pool.shutdown)
@@ -1,19 +1,38 @@
 import os
-import requests
+import logging
 from typing import List, Dict, Optional
 from dotenv import load_dotenv
 import base64
+import threading
+import time
 from datetime import datetime, timedelta
+from app.services.http_client import HttpClient
+from app.services.rate_limiter import TokenBucket
+from app.services.research_cache import ebay_cache
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Client-side pacing of Browse API calls, shared by every thread
+RATE_PER_SECOND = float(os.getenv("EBAY_RATE_PER_SECOND", "5"))
+RATE_BURST = float(os.getenv("EBAY_RATE_BURST", "10"))
+RATE_MAX_WAIT = float(os.getenv("EBAY_RATE_MAX_WAIT", "30"))
+# After a failed token request, callers skip eBay for this long instead of retrying
+TOKEN_RETRY_SECONDS = int(os.getenv("EBAY_TOKEN_RETRY_SECONDS", "30"))
+
 class eBayAPI:
     def __init__(self):
         self.client_id = os.getenv("EBAY_CLIENT_ID")
         self.client_secret = os.getenv("EBAY_CLIENT_SECRET")
-        self.base_url = "https://api.ebay.com"
+        self.base_url = os.getenv("EBAY_API_URL", "https://api.ebay.com").rstrip('/')
+        self.http = HttpClient("ebay")
         self.token = None
         self.token_expiry = None
+        self.token_retry_at = None
+        self._token_lock = threading.Lock()
+        self.rate_limiter = TokenBucket(RATE_PER_SECOND, RATE_BURST)
+        self._token_stats = {"refreshes": 0, "refresh_failures": 0, "waited_for_refresh": 0}
         
         # Debug logging
         if self.client_id and self.client_secret:
@@ -21,17 +40,38 @@ class eBayAPI:
         else:
             print("WARNING: eBay API credentials NOT found in environment variables")
             
-    def _get_access_token(self):
+    def _get_access_token(self, budget: float = None):
         """
-        Get OAuth token for eBay API
+        Get OAuth token for eBay API.
+        Single-flight: one thread refreshes while concurrent callers wait for
+        its result instead of requesting tokens of their own.
         """
-        if self.token and self.token_expiry and datetime.now() < self.token_expiry:
+        if self._token_valid():
             return self.token
-            
+        
         if not self.client_id or not self.client_secret:
             print("Warning: eBay API credentials not set")
             return None
-            
+        
+        if not self._token_lock.acquire(blocking=False):
+            # Another thread is refreshing; use its token
+            with self._token_lock:
+                self._token_stats["waited_for_refresh"] += 1
+                return self.token if self._token_valid() else None
+        
+        try:
+            if self._token_valid():
+                return self.token
+            if self.token_retry_at and datetime.now() < self.token_retry_at:
+                return None
+            return self._refresh_token(budget)
+        finally:
+            self._token_lock.release()
+    
+    def _token_valid(self) -> bool:
+        return bool(self.token and self.token_expiry and datetime.now() < self.token_expiry)
+    
+    def _refresh_token(self, budget: float = None):
         # Create base64 encoded credentials
         credentials = f"{self.client_id}:{self.client_secret}"
         encoded_credentials = base64.b64encode(credentials.encode()).decode()
@@ -47,32 +87,47 @@ class eBayAPI:
         }
         
         try:
-            response = requests.post(
+            response = self.http.post(
                 f"{self.base_url}/identity/v1/oauth2/token",
                 headers=headers,
-                data=data
+                data=data,
+                budget=budget
             )
             response.raise_for_status()
+            self._token_stats["refreshes"] += 1
             
             token_data = response.json()
             self.token = token_data['access_token']
             # Set expiry 5 minutes before actual expiry
             expires_in = token_data.get('expires_in', 7200)
             self.token_expiry = datetime.now() + timedelta(seconds=expires_in - 300)
+            self.token_retry_at = None
             
             return self.token
             
         except Exception as e:
-            print(f"Error getting eBay access token: {e}")
+            logger.warning("Error getting eBay access token: %s", e)
+            self._token_stats["refresh_failures"] += 1
+            self.token_retry_at = datetime.now() + timedelta(seconds=TOKEN_RETRY_SECONDS)
             return None
     
-    def search_completed_items(self, query: str, category_id: Optional[str] = None) -> List[Dict]:
+    def search_completed_items(self, query: str, category_id: Optional[str] = None, budget: float = None) -> List[Dict]:
         """
-        Search for completed/sold items on eBay
+        Search for completed/sold items on eBay, served from cache when possible.
+        Raises when eBay couldn't be queried (no token, rate limit wait
+        exceeded, HTTP error), so callers can tell that from no sales.
+        budget caps the seconds spent, token request and rate-limit wait included.
         """
-        token = self._get_access_token()
+        return ebay_cache.get_or_fetch(
+            [query, category_id],
+            lambda: self._search_completed_items(query, category_id, budget)
+        )
+    
+    def _search_completed_items(self, query: str, category_id: Optional[str], budget: float = None) -> List[Dict]:
+        deadline = time.monotonic() + budget if budget is not None else None
+        token = self._get_access_token(budget)
         if not token:
-            return []
+            raise RuntimeError("eBay API: no access token (credentials missing or token request failed)")
             
         headers = {
             'Authorization': f'Bearer {token}',
@@ -90,45 +145,53 @@ class eBayAPI:
         if category_id:
             params['category_ids'] = category_id
             
+        max_wait = RATE_MAX_WAIT if deadline is None else min(RATE_MAX_WAIT, _remaining(deadline))
+        if not self.rate_limiter.acquire(timeout=max_wait):
+            logger.warning("eBay API: rate limit wait exceeded %.1fs, skipping '%s'", max_wait, query)
+            raise RuntimeError(f"eBay API: rate limit wait exceeded {max_wait:.1f}s")
+            
         try:
             # Search completed items
-            response = requests.get(
+            response = self.http.get(
                 f"{self.base_url}/buy/browse/v1/item_summary/search",
                 headers=headers,
-                params=params
+                params=params,
+                budget=None if deadline is None else _remaining(deadline)
             )
+            if response.status_code == 401:
+                # Token revoked or expired early; force the next call to refresh it
+                self.token_expiry = None
             response.raise_for_status()
-            
             data = response.json()
-            results = []
-            
-            for item in data.get('itemSummaries', []):
-                # Only include sold items
-                if item.get('itemEndDate'):
-                    results.append({
-                        'title': item.get('title'),
-                        'price': float(item.get('price', {}).get('value', 0)),
-                        'currency': item.get('price', {}).get('currency', 'USD'),
-                        'condition': item.get('condition'),
-                        'sold_date': item.get('itemEndDate'),
-                        'link': item.get('itemWebUrl'),
-                        'image': item.get('image', {}).get('imageUrl'),
-                        'seller': item.get('seller', {}).get('username'),
-                        'location': item.get('itemLocation', {}).get('country')
-                    })
-                    
-            return results
-            
         except Exception as e:
-            print(f"Error searching eBay completed items: {e}")
-            return []
+            logger.warning("Error searching eBay completed items: %s", e)
+            raise
+            
+        results = []
+        for item in data.get('itemSummaries', []):
+            # Only include sold items
+            if item.get('itemEndDate'):
+                results.append({
+                    'title': item.get('title'),
+                    'price': float(item.get('price', {}).get('value', 0)),
+                    'currency': item.get('price', {}).get('currency', 'USD'),
+                    'condition': item.get('condition'),
+                    'sold_date': item.get('itemEndDate'),
+                    'link': item.get('itemWebUrl'),
+                    'image': item.get('image', {}).get('imageUrl'),
+                    'seller': item.get('seller', {}).get('username'),
+                    'location': item.get('itemLocation', {}).get('country')
+                })
+                
+        return results
     
-    def get_sold_prices_stats(self, query: str) -> Dict:
+    def get_sold_prices_stats(self, query: str, budget: float = None) -> Dict:
         """
-        Get statistics on sold prices for an item
+        Get statistics on sold prices for an item. Empty stats mean eBay
+        answered with no sales; a failed lookup raises instead.
         """
         print(f"eBay API: Searching for sold prices of '{query}'")
-        sold_items = self.search_completed_items(query)
+        sold_items = self.search_completed_items(query, budget=budget)
         
         if not sold_items:
             print(f"eBay API: No sold items found for '{query}'")
@@ -165,5 +228,18 @@ class eBayAPI:
             'recent_sales': sold_items[:10]  # Last 10 sales
         }
 
+    def metrics(self) -> Dict:
+        return {
+            "token": {
+                **self._token_stats,
+                "valid": self._token_valid(),
+                "expires_at": self.token_expiry.isoformat() if self.token_expiry else None
+            },
+            "rate_limiter": self.rate_limiter.metrics()
+        }
+
+def _remaining(deadline: float) -> float:
+    return max(0.1, deadline - time.monotonic())
+
 # Singleton instance
 ebay_api = eBayAPI() 
\ No newline at end of file
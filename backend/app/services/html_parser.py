@@ -0,0 +1,188 @@
+import re
+from typing import Dict, List
+import lxml.html
+
+SITE_URL = "https://shopgoodwill.com"
+
+TITLE_CLASS = re.compile(r'title|name|feat-item_name')
+PRICE_CLASS = re.compile(r'price|feat-item_price')
+PRICE_TEXT = re.compile(r'\$[\d,]+\.?\d*')
+BIDS_TEXT = re.compile(r'Number of Bids:')
+THUMB_SIZE = re.compile(r'/w_\d+/')
+
+def _fromstring(html: str):
+    return lxml.html.document_fromstring(html)
+
+def _classes(el) -> List[str]:
+    return (el.get('class') or '').split()
+
+def _class_matches(el, pattern) -> bool:
+    return any(pattern.search(c) for c in _classes(el))
+
+def _text(el) -> str:
+    return el.text_content().strip()
+
+def _next_td(el):
+    # Equivalent of BeautifulSoup's find_next('td'): first td after el's start tag
+    found = el.xpath('(descendant::td | following::td)[1]')
+    return found[0] if found else None
+
+def parse_listing(html: str) -> List[Dict]:
+    """
+    Extract auction tiles from a category listing page.
+    Each tile is read in a single pass over its own subtree.
+    """
+    doc = _fromstring(html)
+    scraped_data = []
+
+    for product in doc.xpath('//div[contains(@class, "item-col")]'):
+        try:
+            link_elem = title_elem = price_elem = img_elem = None
+
+            for el in product.iterdescendants():
+                if not isinstance(el.tag, str):
+                    continue
+                if link_elem is None and el.tag == 'a' and el.get('href') is not None:
+                    link_elem = el
+                if img_elem is None and el.tag == 'img':
+                    img_elem = el
+                if title_elem is None and _class_matches(el, TITLE_CLASS):
+                    title_elem = el
+                if price_elem is None and _class_matches(el, PRICE_CLASS):
+                    price_elem = el
+
+            if link_elem is None:
+                continue
+
+            auction_url = link_elem.get('href', '')
+            if not auction_url.startswith('http'):
+                auction_url = f"{SITE_URL}{auction_url}"
+
+            title = ''
+            if title_elem is not None:
+                title = _text(title_elem)
+            elif img_elem is not None and img_elem.get('alt'):
+                title = img_elem.get('alt', '').strip()
+
+            if not title:
+                continue
+
+            price = ''
+            if price_elem is not None:
+                price = _text(price_elem)
+            else:
+                # Look for any text containing $
+                price_text = next((t for t in product.itertext() if PRICE_TEXT.search(t)), None)
+                if price_text:
+                    price = price_text.strip()
+
+            image_url = ''
+            if img_elem is not None:
+                image_url = img_elem.get('src', '')
+                if not image_url.startswith('http'):
+                    image_url = f"{SITE_URL}{image_url}"
+
+            scraped_data.append({
+                'title': title,
+                'price': price or '$0.00',
+                'image_url': image_url,
+                'auction_url': auction_url
+            })
+
+        except Exception as e:
+            print(f"Error parsing product: {e}")
+            continue
+
+    return scraped_data
+
+def parse_item_detail(html: str) -> Dict:
+    """
+    Extract title, price, bids, images, description, detail table and seller
+    from an item page in one walk over the document.
+    """
+    doc = _fromstring(html)
+
+    title_elem = price_elem = bids_owner = seller_owner = desc_header = None
+    carousel, thumbs, others = [], [], []
+    item_details = {}
+
+    for el in doc.iter():
+        if not isinstance(el.tag, str):
+            continue
+        tag = el.tag
+
+        if tag == 'h1' and title_elem is None:
+            title_elem = el
+        elif tag == 'h2' and price_elem is None and 'mb-0' in _classes(el):
+            price_elem = el
+        elif tag == 'h3' and desc_header is None and el.text == 'Item Description' and len(el) == 0:
+            desc_header = el
+        elif tag == 'img':
+            src = el.get('src', '')
+            if src and 'shopgoodwillimages' in src:
+                classes = _classes(el)
+                if 'd-block' in classes:
+                    carousel.append(src)
+                if 'img-thumbnail' in classes:
+                    # Convert thumbnail to full size by removing size parameters
+                    thumbs.append(THUMB_SIZE.sub('/', src))
+                if 'Items' in src:
+                    others.append(src)
+        elif tag == 'tr':
+            th = next(el.iterdescendants('th'), None)
+            td = next(el.iterdescendants('td'), None)
+            if th is not None and td is not None:
+                item_details[_text(th).replace(':', '')] = _text(td)
+
+        # Text nodes: el.text belongs to el, el.tail to its parent
+        for text, owner in ((el.text, el), (el.tail, el.getparent())):
+            if not text or owner is None:
+                continue
+            if bids_owner is None and BIDS_TEXT.search(text):
+                bids_owner = owner
+            if seller_owner is None and text == 'Seller:':
+                seller_owner = owner
+
+    data = {}
+
+    if title_elem is not None:
+        data['title'] = _text(title_elem)
+
+    if price_elem is not None:
+        data['current_price'] = _text(price_elem)
+
+    if bids_owner is not None and bids_owner.getparent() is not None:
+        bid_value = _next_td(bids_owner.getparent())
+        if bid_value is not None:
+            data['num_bids'] = _text(bid_value)
+
+    images = carousel + thumbs
+    for src in others:
+        if not any(src in existing for existing in images):
+            images.append(src)
+    data['all_images'] = list(set(images))  # Remove duplicates
+
+    if desc_header is not None:
+        desc_div = next((sib for sib in desc_header.itersiblings() if sib.tag == 'div'), None)
+        if desc_div is not None:
+            data['description_html'] = lxml.html.tostring(desc_div, encoding='unicode', with_tail=False)
+            data['description_text'] = html_to_text(desc_div)
+
+    data['item_details'] = item_details
+    if item_details.get('End Time'):
+        data['end_time'] = item_details['End Time']
+
+    if seller_owner is not None:
+        seller_value = _next_td(seller_owner)
+        if seller_value is not None:
+            data['seller'] = _text(seller_value)
+
+    return data
+
+def html_to_text(node) -> str:
+    """
+    Plain text of an element or HTML fragment, one stripped line per text node
+    """
+    if isinstance(node, str):
+        node = lxml.html.fragment_fromstring(node, create_parent='div')
+    return '\n'.join(text.strip() for text in node.itertext() if text.strip())
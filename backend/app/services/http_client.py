@@ -0,0 +1,207 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from typing import Dict, Optional
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Responses worth retrying: rate limiting and transient upstream failures
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "20"))
+MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", "0.5"))
+BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "10"))
+POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+
+_clients = []
+
+class HttpClient:
+    """
+    Keep-alive HTTP client shared by the outbound services.
+
+    Connections are pooled per host (at most pool_size open to any one host;
+    extra callers wait for a free connection). Requests time out, and 429/5xx
+    responses or connection errors are retried with full-jitter exponential
+    backoff, honouring a numeric Retry-After. The final response is returned
+    as-is, so callers keep their own raise_for_status handling. A request
+    given a budget (seconds) fits every attempt and backoff inside it, so a
+    caller with its own deadline isn't outlived by retries.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        headers: Optional[Dict] = None,
+        pool_size: int = POOL_SIZE,
+        timeout: tuple = (CONNECT_TIMEOUT, READ_TIMEOUT),
+        max_retries: int = MAX_RETRIES,
+        backoff_base: float = BACKOFF_BASE,
+        backoff_max: float = BACKOFF_MAX
+    ):
+        self.name = name
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        if headers:
+            self.session.headers.update(headers)
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "retries": 0, "failures": 0}
+        _clients.append(self)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def request(self, method: str, url: str, budget: Optional[float] = None, **kwargs) -> requests.Response:
+        timeout = kwargs.pop('timeout', self.timeout)
+        deadline = time.monotonic() + budget if budget is not None else None
+        attempt = 0
+        while True:
+            self._count("requests")
+            try:
+                response = self.session.request(method, url, timeout=_within(timeout, deadline), **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_max)
+                if attempt >= self.max_retries or _past(deadline, delay):
+                    self._count("failures")
+                    raise
+                print(f"{self.name}: {method} {url} failed ({e}), retrying in {delay:.1f}s")
+            else:
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_max, response.headers.get('Retry-After'))
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries or _past(deadline, delay):
+                    if response.status_code >= 400:
+                        self._count("failures")
+                    return response
+                print(f"{self.name}: {method} {url} returned {response.status_code}, retrying in {delay:.1f}s")
+                response.close()
+
+            self._count("retries")
+            attempt += 1
+            time.sleep(delay)
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            return dict(self._stats)
+
+    def _count(self, stat: str):
+        with self._lock:
+            self._stats[stat] += 1
+
+class AsyncHttpClient:
+    """
+    asyncio counterpart of HttpClient (same pooling, timeouts and retry
+    policy) for callers running on the event loop.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        headers: Optional[Dict] = None,
+        pool_size: int = POOL_SIZE,
+        timeout: tuple = (CONNECT_TIMEOUT, READ_TIMEOUT),
+        max_retries: int = MAX_RETRIES,
+        backoff_base: float = BACKOFF_BASE,
+        backoff_max: float = BACKOFF_MAX
+    ):
+        self.name = name
+        self.headers = headers or {}
+        self.pool_size = pool_size
+        self.timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._client = None
+        self._stats = {"requests": 0, "retries": 0, "failures": 0}
+        _clients.append(self)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+            )
+        return self._client
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request('POST', url, **kwargs)
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        attempt = 0
+        while True:
+            self._stats["requests"] += 1
+            try:
+                response = await self.client.request(method, url, **kwargs)
+            except (httpx.ConnectError, httpx.TimeoutException) as e:
+                if attempt >= self.max_retries:
+                    self._stats["failures"] += 1
+                    raise
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_max)
+                print(f"{self.name}: {method} {url} failed ({e}), retrying in {delay:.1f}s")
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    if response.status_code >= 400:
+                        self._stats["failures"] += 1
+                    return response
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_max, response.headers.get('Retry-After'))
+                print(f"{self.name}: {method} {url} returned {response.status_code}, retrying in {delay:.1f}s")
+                await response.aclose()
+
+            self._stats["retries"] += 1
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def metrics(self) -> Dict:
+        return dict(self._stats)
+
+def _within(timeout, deadline: Optional[float]):
+    # Shrink a (connect, read) timeout so the attempt ends by the deadline
+    if deadline is None:
+        return timeout
+    remaining = max(0.1, deadline - time.monotonic())
+    if isinstance(timeout, tuple):
+        return tuple(min(part, remaining) for part in timeout)
+    return min(timeout, remaining) if timeout is not None else remaining
+
+def _past(deadline: Optional[float], delay: float) -> bool:
+    # True when a retry after delay seconds couldn't start before the deadline
+    return deadline is not None and time.monotonic() + delay >= deadline
+
+def backoff_delay(attempt: int, base: float, cap: float, retry_after: Optional[str] = None) -> float:
+    """
+    Full-jitter exponential backoff, or the server's Retry-After (seconds) if it asked for longer
+    """
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    if retry_after:
+        try:
+            delay = max(delay, min(float(retry_after), cap))
+        except ValueError:
+            pass  # HTTP-date form; fall back to our own backoff
+    return delay
+
+def http_metrics() -> Dict:
+    return {client.name: client.metrics() for client in _clients}
@@ -0,0 +1,234 @@
+import base64
+import hashlib
+import io
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from PIL import Image
+from app.services.browser_pool import USER_AGENT
+from app.services.http_client import HttpClient
+
+load_dotenv()
+
+IMAGE_STORE_DIR = os.getenv("IMAGE_STORE_DIR", os.path.join("data", "images"))
+# Longest side for the main image and for the extra images
+MAIN_MAX_SIDE = int(os.getenv("IMAGE_MAX_SIDE", "1024"))
+EXTRA_MAX_SIDE = int(os.getenv("IMAGE_EXTRA_MAX_SIDE", "512"))
+JPEG_QUALITY = int(os.getenv("IMAGE_JPEG_QUALITY", "80"))
+# Estimated vision tokens allowed per request; extra images past it are dropped
+TOKEN_BUDGET = int(os.getenv("IMAGE_TOKEN_BUDGET", "2500"))
+# Images whose difference hashes differ in at most this many bits count as duplicates
+DEDUPE_DISTANCE = int(os.getenv("IMAGE_DEDUPE_DISTANCE", "5"))
+
+_http = HttpClient("images", headers={'User-Agent': USER_AGENT})
+_fetch_executor = ThreadPoolExecutor(max_workers=6, thread_name_prefix="image-fetch")
+_lock = threading.Lock()
+_stats = {
+    "requests": 0,
+    "images_in": 0,
+    "images_sent": 0,
+    "duplicates_dropped": 0,
+    "over_budget_dropped": 0,
+    "fetch_failures": 0,
+    "store_hits": 0,
+    "bytes_original": 0,
+    "bytes_sent": 0,
+    "tokens_original": 0,
+    "tokens_sent": 0
+}
+
+def vision_tokens(width: int, height: int) -> int:
+    """
+    Estimated high-detail image tokens: fit within 2048x2048, scale the
+    short side down to 768, then 170 tokens per 512px tile plus 85
+    """
+    scale = min(1.0, 2048 / max(width, height))
+    width, height = width * scale, height * scale
+    scale = min(1.0, 768 / min(width, height))
+    width, height = width * scale, height * scale
+    return 85 + 170 * math.ceil(width / 512) * math.ceil(height / 512)
+
+def prepare_images(urls: List[str]) -> List[Dict]:
+    """
+    Turn listing image URLs into image_url message parts ready for the model.
+
+    Each image is downloaded once into a local content-addressed store,
+    near-duplicates are dropped, and the rest are resized (the first image
+    to IMAGE_MAX_SIDE, the others to IMAGE_EXTRA_MAX_SIDE), re-encoded as
+    JPEG and inlined as base64 until the token budget is spent. Images
+    that can't be fetched or decoded fall back to their URL.
+    """
+    urls = list(dict.fromkeys(url for url in urls if url))
+    originals = list(_fetch_executor.map(_load_original_or_none, urls))
+
+    parts = []
+    kept_hashes = []
+    report = {"in": len(urls), "duplicates": 0, "over_budget": 0, "failures": 0,
+              "bytes_original": 0, "bytes_sent": 0, "tokens_original": 0, "tokens_sent": 0, "store_hits": 0}
+
+    for index, (url, original) in enumerate(zip(urls, originals)):
+        if original is None:
+            report["failures"] += 1
+            parts.append({"type": "image_url", "image_url": {"url": url}})
+            continue
+
+        digest, data, store_hit = original
+        report["store_hits"] += store_hit
+        try:
+            with Image.open(io.BytesIO(data)) as image:
+                image.load()
+                fingerprint = _difference_hash(image)
+                if any(_hamming(fingerprint, kept) <= DEDUPE_DISTANCE for kept in kept_hashes):
+                    report["duplicates"] += 1
+                    continue
+
+                variant = _load_variant(digest, image, MAIN_MAX_SIDE if index == 0 else EXTRA_MAX_SIDE)
+                original_tokens = vision_tokens(*image.size)
+        except Exception as e:
+            print(f"Could not process image {url}: {e}")
+            report["failures"] += 1
+            parts.append({"type": "image_url", "image_url": {"url": url}})
+            continue
+
+        variant_bytes, variant_size = variant
+        tokens = vision_tokens(*variant_size)
+        if index > 0 and report["tokens_sent"] + tokens > TOKEN_BUDGET:
+            report["over_budget"] += 1
+            continue
+
+        kept_hashes.append(fingerprint)
+        report["bytes_original"] += len(data)
+        report["bytes_sent"] += len(variant_bytes)
+        report["tokens_original"] += original_tokens
+        report["tokens_sent"] += tokens
+        encoded = base64.b64encode(variant_bytes).decode()
+        parts.append({"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{encoded}"}})
+
+    _record(report, len(parts))
+    print(
+        f"Images: {report['in']} -> {len(parts)} sent ({report['duplicates']} duplicate, "
+        f"{report['over_budget']} over budget, {report['failures']} failed), "
+        f"{report['bytes_original'] / 1024:.0f}KB -> {report['bytes_sent'] / 1024:.0f}KB, "
+        f"~{report['tokens_original']} -> ~{report['tokens_sent']} tokens"
+    )
+    return parts
+
+def image_metrics() -> Dict:
+    with _lock:
+        stats = dict(_stats)
+    stats["bytes_saved"] = stats["bytes_original"] - stats["bytes_sent"]
+    stats["tokens_saved"] = stats["tokens_original"] - stats["tokens_sent"]
+    return stats
+
+def _record(report: Dict, sent: int):
+    with _lock:
+        _stats["requests"] += 1
+        _stats["images_in"] += report["in"]
+        _stats["images_sent"] += sent
+        _stats["duplicates_dropped"] += report["duplicates"]
+        _stats["over_budget_dropped"] += report["over_budget"]
+        _stats["fetch_failures"] += report["failures"]
+        _stats["store_hits"] += report["store_hits"]
+        for key in ("bytes_original", "bytes_sent", "tokens_original", "tokens_sent"):
+            _stats[key] += report[key]
+
+def _path(*parts: str) -> str:
+    return os.path.join(IMAGE_STORE_DIR, *parts)
+
+def _write_atomic(path: str, data: bytes) -> bool:
+    """
+    Best-effort store write; the caller already holds the bytes, so a full
+    or read-only disk only costs the next lookup a download
+    """
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+        return True
+    except OSError as e:
+        print(f"Could not write image store file {path}: {e}")
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        return False
+
+def _load_original_or_none(url: str) -> Optional[tuple]:
+    # Anything unexpected falls back to sending the URL, like a failed fetch
+    try:
+        return _load_original(url)
+    except Exception as e:
+        print(f"Could not load image {url}: {e}")
+        return None
+
+def _load_original(url: str) -> Optional[tuple]:
+    """
+    (content sha256, bytes, came from the store) for url, downloading it only
+    the first time; None if it can't be fetched
+    """
+    ref_path = _path("urls", hashlib.sha256(url.encode()).hexdigest())
+    try:
+        with open(ref_path) as f:
+            digest = f.read().strip()
+        with open(_path("originals", digest), 'rb') as f:
+            return digest, f.read(), True
+    except OSError:
+        pass
+
+    try:
+        response = _http.get(url)
+        response.raise_for_status()
+    except Exception as e:
+        print(f"Could not fetch image {url}: {e}")
+        return None
+
+    data = response.content
+    digest = hashlib.sha256(data).hexdigest()
+    original_path = _path("originals", digest)
+    # Point the URL at the original only once the original is on disk
+    if os.path.exists(original_path) or _write_atomic(original_path, data):
+        _write_atomic(ref_path, digest.encode())
+    return digest, data, False
+
+def _load_variant(digest: str, image: Image.Image, max_side: int) -> tuple:
+    """
+    (JPEG bytes, (width, height)) of the image scaled to max_side, cached by
+    original digest and settings
+    """
+    scale = min(1.0, max_side / max(image.size))
+    size = (max(1, round(image.size[0] * scale)), max(1, round(image.size[1] * scale)))
+    variant_path = _path("variants", f"{digest}_{max_side}_{JPEG_QUALITY}.jpg")
+    try:
+        with open(variant_path, 'rb') as f:
+            return f.read(), size
+    except OSError:
+        pass
+
+    resized = image.convert("RGB")
+    if size != image.size:
+        resized = resized.resize(size, Image.LANCZOS)
+    buffer = io.BytesIO()
+    resized.save(buffer, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+    data = buffer.getvalue()
+    _write_atomic(variant_path, data)
+    return data, size
+
+def _difference_hash(image: Image.Image, hash_size: int = 8) -> int:
+    # Perceptual hash: compare neighbouring pixels of a tiny grayscale copy
+    small = image.convert("L").resize((hash_size + 1, hash_size), Image.LANCZOS)
+    pixels = list(small.getdata())
+    bits = 0
+    for row in range(hash_size):
+        for col in range(hash_size):
+            left = pixels[row * (hash_size + 1) + col]
+            right = pixels[row * (hash_size + 1) + col + 1]
+            bits = (bits << 1) | (left > right)
+    return bits
+
+def _hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
@@ -0,0 +1,162 @@
+import os
+from typing import Dict, List
+from sqlalchemy import select, update, literal_column
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.models.auction import Auction
+from app.services.scraper import crawl
+from app.services.utils import parse_price, parse_bid_count, parse_end_time
+
+UPSERT_BATCH_SIZE = int(os.getenv("SCRAPE_UPSERT_BATCH_SIZE", "500"))
+
+# Columns refreshed when a listing we already hold is scraped again
+UPDATE_COLUMNS = ['price', 'price_value']
+
+def _insert_for(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == 'postgresql':
+        return postgresql.insert
+    if dialect == 'sqlite':
+        return sqlite.insert
+    raise NotImplementedError(f"Bulk upsert is not supported on {dialect}")
+
+def upsert_auctions(db: Session, items: List[Dict], batch_size: int = UPSERT_BATCH_SIZE) -> Dict:
+    """
+    Insert scraped listings, updating the price of ones we already hold.
+    Each batch is a single INSERT ... ON CONFLICT (auction_url) DO UPDATE that
+    only touches rows whose values actually changed.
+    Returns counts plus the ids of new and changed auctions.
+    """
+    result = {'inserted': 0, 'updated': 0, 'new_ids': [], 'changed_ids': []}
+    if not items:
+        return result
+
+    insert = _insert_for(db)
+    is_postgres = db.get_bind().dialect.name == 'postgresql'
+
+    # ON CONFLICT can't touch the same row twice in one statement; keep the last copy
+    rows = [
+        {**item, 'price_value': parse_price(item.get('price'))}
+        for item in {item['auction_url']: item for item in items}.values()
+    ]
+
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+
+        stmt = insert(Auction).values(batch)
+        changed = None
+        for column in UPDATE_COLUMNS:
+            differs = getattr(Auction, column).is_distinct_from(getattr(stmt.excluded, column))
+            changed = differs if changed is None else (changed | differs)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Auction.auction_url],
+            set_={column: getattr(stmt.excluded, column) for column in UPDATE_COLUMNS},
+            where=changed
+        )
+
+        if is_postgres:
+            # xmax is 0 only for rows this statement inserted
+            stmt = stmt.returning(Auction.id, literal_column("(xmax = 0)").label("inserted"))
+            returned = db.execute(stmt).all()
+        else:
+            urls = [row['auction_url'] for row in batch]
+            existing = set(db.scalars(select(Auction.auction_url).where(Auction.auction_url.in_(urls))))
+            stmt = stmt.returning(Auction.id, Auction.auction_url)
+            returned = [(row_id, url not in existing) for row_id, url in db.execute(stmt).all()]
+
+        for row_id, inserted in returned:
+            if inserted:
+                result['new_ids'].append(row_id)
+            else:
+                result['changed_ids'].append(row_id)
+
+    db.commit()
+    result['inserted'] = len(result['new_ids'])
+    result['updated'] = len(result['changed_ids'])
+    return result
+
+def crawl_into_db(db: Session, categories: List[str] = None, max_pages: int = None, backend: str = None) -> Dict:
+    """
+    Incremental crawl: walk the categories until pages stop yielding listings
+    we don't already hold, upserting each page as it arrives.
+    Returns the upsert totals plus the crawl stats under 'scrape'.
+    """
+    known_urls = {url for (url,) in db.query(Auction.auction_url)}
+    totals = {'inserted': 0, 'updated': 0, 'new_ids': [], 'changed_ids': []}
+
+    def save_page(items):
+        # Upsert each page as it arrives so a long crawl streams into the DB
+        result = upsert_auctions(db, items)
+        for key in totals:
+            totals[key] += result[key]
+
+    stats = crawl(categories, on_page=save_page, known_urls=known_urls, max_pages=max_pages, backend=backend)
+    print(f"Scraped {stats['items']} items from {stats['pages']} pages: "
+          f"{totals['inserted']} new, {totals['updated']} price changes")
+    return {**totals, 'scrape': stats}
+
+def backfill_numeric_columns(db: Session, batch_size: int = 1000) -> int:
+    """
+    Fill price_value/bid_count for rows stored before those columns existed.
+    Returns the number of rows updated.
+    """
+    updated = 0
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(Auction.id, Auction.price, Auction.num_bids)
+            .where(Auction.id > last_id)
+            .where(
+                (Auction.price_value.is_(None) & Auction.price.isnot(None)) |
+                (Auction.bid_count.is_(None) & Auction.num_bids.isnot(None))
+            )
+            .order_by(Auction.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+
+        changes = []
+        for row_id, price, num_bids in rows:
+            price_value = parse_price(price)
+            bid_count = parse_bid_count(num_bids)
+            if price_value is not None or bid_count is not None:
+                changes.append({'id': row_id, 'price_value': price_value, 'bid_count': bid_count})
+        if changes:
+            db.execute(update(Auction), changes)
+            db.commit()
+            updated += len(changes)
+        last_id = rows[-1][0]
+
+    return updated
+
+def backfill_end_times(db: Session, batch_size: int = 1000) -> int:
+    """
+    Fill ends_at from the stored item details of rows scraped before the
+    column existed. Returns the number of rows updated.
+    """
+    updated = 0
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(Auction.id, Auction.item_details)
+            .where(Auction.id > last_id)
+            .where(Auction.ends_at.is_(None), Auction.item_details.isnot(None))
+            .order_by(Auction.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+
+        changes = []
+        for row_id, item_details in rows:
+            ends_at = parse_end_time((item_details or {}).get('End Time'))
+            if ends_at is not None:
+                changes.append({'id': row_id, 'ends_at': ends_at})
+        if changes:
+            db.execute(update(Auction), changes)
+            db.commit()
+            updated += len(changes)
+        last_id = rows[-1][0]
+
+    return updated
@@ -0,0 +1,264 @@
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from app.database import SessionLocal
+from app.models.job import (
+    Job, JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED, JOB_PARTIAL, JOB_FAILED
+)
+from app.models.auction import Auction
+from app.services.auction_pipeline import run_analyses, run_screening, apply_analysis
+from app.services.screening import SCREEN_BATCH_SIZE
+
+load_dotenv()
+
+# Job kinds: 'reanalyze' ignores cached model responses; 'screen' runs a
+# cheap batched pass first and fully analyzes only the promising auctions
+JOB_ANALYZE = "analyze"
+JOB_REANALYZE = "reanalyze"
+JOB_SCREEN = "screen"
+
+# Per-auction result status for screened auctions still awaiting full analysis
+RESULT_PROMOTED = "promoted"
+
+class JobQueue:
+    """
+    Durable background queue for analysis work.
+
+    Jobs live in the jobs table, so they survive restarts and can be picked
+    up by any process sharing the database. Workers claim a queued job with
+    a conditional UPDATE and analyze its auctions in parallel chunks, writing
+    each chunk's results and the job's progress in one commit. While a job
+    runs, a heartbeat thread refreshes its heartbeat_at every fifth of the
+    lease, so however long a chunk takes the lease only expires when the
+    worker is gone. Running jobs whose heartbeat goes stale are re-queued and
+    resume from the auctions they hadn't finished.
+    """
+
+    def __init__(self, workers: int = 2, poll_interval: float = 2.0, lease_seconds: int = 600, chunk_size: int = 25):
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.heartbeat_interval = max(1.0, lease_seconds / 5)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        if self._threads:
+            return
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        print(f"Job queue started with {self.workers} workers")
+
+    def stop(self, timeout: float = 10):
+        """
+        Stop claiming new jobs. A job in progress is left 'running' and is
+        re-queued by the next process once its heartbeat expires.
+        """
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+        print("Job queue stopped")
+
+    def submit(self, db: Session, auction_ids: List[int], kind: str = JOB_ANALYZE) -> Job:
+        job = Job(kind=kind, auction_ids=list(auction_ids), total=len(auction_ids), results={})
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        self._wake.set()
+        return job
+
+    def _worker(self):
+        while not self._stop.is_set():
+            try:
+                job_id = self._claim()
+            except Exception as e:
+                print(f"Error claiming job: {e}")
+                job_id = None
+
+            if job_id is None:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+                continue
+
+            heartbeat_stop = self._start_heartbeat(job_id)
+            try:
+                self._run(job_id)
+            except Exception as e:
+                print(f"Job {job_id} crashed: {e}")
+                with SessionLocal() as db:
+                    db.execute(
+                        update(Job).where(Job.id == job_id)
+                        .values(status=JOB_FAILED, error=str(e), finished_at=_utcnow())
+                    )
+                    db.commit()
+            finally:
+                heartbeat_stop.set()
+
+    def _start_heartbeat(self, job_id: str) -> threading.Event:
+        """
+        Keep a running job's lease alive from a separate thread until the
+        returned event is set
+        """
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(self.heartbeat_interval):
+                try:
+                    with SessionLocal() as db:
+                        db.execute(
+                            update(Job)
+                            .where(Job.id == job_id, Job.status == JOB_RUNNING)
+                            .values(heartbeat_at=_utcnow())
+                        )
+                        db.commit()
+                except Exception as e:
+                    print(f"Heartbeat failed for job {job_id}: {e}")
+
+        threading.Thread(target=beat, name=f"job-heartbeat-{job_id[:8]}", daemon=True).start()
+        return stop
+
+    def _claim(self) -> Optional[str]:
+        now = _utcnow()
+        with SessionLocal() as db:
+            # Re-queue jobs whose worker stopped heartbeating
+            db.execute(
+                update(Job)
+                .where(Job.status == JOB_RUNNING, Job.heartbeat_at < now - timedelta(seconds=self.lease_seconds))
+                .values(status=JOB_QUEUED)
+            )
+            db.commit()
+
+            candidates = db.scalars(
+                select(Job.id).where(Job.status == JOB_QUEUED).order_by(Job.created_at).limit(5)
+            ).all()
+            for job_id in candidates:
+                claimed = db.execute(
+                    update(Job)
+                    .where(Job.id == job_id, Job.status == JOB_QUEUED)
+                    .values(status=JOB_RUNNING, started_at=now, heartbeat_at=now)
+                )
+                db.commit()
+                if claimed.rowcount == 1:
+                    return job_id
+        return None
+
+    def _run(self, job_id: str):
+        # Keep job's attributes loaded across commits; reading an expired one
+        # would open a transaction and hold a connection through the analyses
+        with SessionLocal(expire_on_commit=False) as db:
+            job = db.get(Job, job_id)
+            kind, auction_ids = job.kind, list(job.auction_ids)
+            results = dict(job.results or {})
+            # Skip auctions finished before a restart
+            pending = [auction_id for auction_id in auction_ids if str(auction_id) not in results]
+            print(f"Running job {job_id}: {len(pending)} of {job.total} auctions pending")
+            # Release the connection while the analyses run
+            db.commit()
+
+            if kind == JOB_SCREEN:
+                self._screen(db, job, pending, results)
+                if self._stop.is_set():
+                    return
+                # Only promoted auctions go on to the full analysis
+                pending = [
+                    auction_id for auction_id in auction_ids
+                    if results[str(auction_id)]["status"] == RESULT_PROMOTED
+                ]
+                print(f"Job {job_id}: {len(pending)} auctions promoted to full analysis")
+
+            for start in range(0, len(pending), self.chunk_size):
+                if self._stop.is_set():
+                    return
+                chunk = pending[start:start + self.chunk_size]
+                outcomes = run_analyses(chunk, force_refresh=kind == JOB_REANALYZE)
+
+                # Write the chunk's analyses and the job's progress in one commit
+                auctions = {a.id: a for a in db.query(Auction).filter(Auction.id.in_(chunk))}
+                for auction_id, outcome in outcomes.items():
+                    previous = results.get(str(auction_id), {})
+                    if isinstance(outcome, Exception):
+                        results[str(auction_id)] = {**previous, "status": "failed", "error": str(outcome)}
+                    elif outcome is None or auction_id not in auctions:
+                        results[str(auction_id)] = {"status": "failed", "error": "Auction not found"}
+                    else:
+                        apply_analysis(auctions[auction_id], outcome)
+                        results[str(auction_id)] = {**previous, "status": "succeeded", "estimated_value": outcome['estimated_value']}
+
+                _record_progress(job, results)
+                db.commit()
+
+            job.status = _final_status(job)
+            job.finished_at = _utcnow()
+            db.commit()
+            print(f"Job {job_id} {job.status}: {job.completed} analyzed, {job.failed} failed")
+
+    def _screen(self, db: Session, job: Job, pending: List[int], results: Dict):
+        """
+        Batched first pass: auctions that don't clear the screen finish here,
+        the rest are marked promoted for the full analysis
+        """
+        for start in range(0, len(pending), self.chunk_size * SCREEN_BATCH_SIZE):
+            if self._stop.is_set():
+                return
+            chunk = pending[start:start + self.chunk_size * SCREEN_BATCH_SIZE]
+            outcomes = run_screening(chunk)
+
+            for auction_id in chunk:
+                outcome = outcomes.get(auction_id)
+                if outcome is None:
+                    results[str(auction_id)] = {"status": "failed", "error": "Auction not found"}
+                elif isinstance(outcome, Exception):
+                    results[str(auction_id)] = {"status": "failed", "error": f"Screening failed: {outcome}"}
+                else:
+                    status = RESULT_PROMOTED if outcome["promoted"] else "succeeded"
+                    results[str(auction_id)] = {"status": status, **outcome}
+
+            _record_progress(job, results)
+            db.commit()
+
+def _record_progress(job: Job, results: Dict):
+    # Assign a new dict so SQLAlchemy sees the JSON column change
+    job.results = dict(results)
+    job.completed = sum(1 for r in results.values() if r["status"] == "succeeded")
+    job.failed = sum(1 for r in results.values() if r["status"] == "failed")
+    job.heartbeat_at = _utcnow()
+
+def _final_status(job: Job) -> str:
+    if job.failed == 0:
+        return JOB_SUCCEEDED
+    if job.completed == 0:
+        return JOB_FAILED
+    return JOB_PARTIAL
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+def get_job_snapshot(job_id: str) -> Optional[Dict]:
+    """
+    JSON-ready copy of a job, loaded in its own session (safe from any thread)
+    """
+    with SessionLocal() as db:
+        job = db.get(Job, job_id)
+        return jsonable_encoder(job) if job else None
+
+# Singleton instance
+job_queue = JobQueue(
+    workers=int(os.getenv("JOB_WORKERS", "2")),
+    poll_interval=float(os.getenv("JOB_POLL_INTERVAL", "2")),
+    lease_seconds=int(os.getenv("JOB_LEASE_SECONDS", "600")),
+    chunk_size=int(os.getenv("JOB_CHUNK_SIZE", "25"))
+)
@@ -0,0 +1,90 @@
+import threading
+import time
+from typing import Callable, Dict, Optional, Any
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+_lock = threading.Lock()
+_stats = {
+    'waits': 0,
+    'timeouts': 0,
+    'total_seconds': 0.0,
+    'max_seconds': 0.0
+}
+
+def wait_until_ready(
+    page,
+    selector: Optional[str] = None,
+    predicate: Optional[Callable[[Any], bool]] = None,
+    network_idle: bool = False,
+    timeout_ms: int = 5000,
+    stable_ms: int = 500,
+    poll_ms: int = 100,
+    label: str = "page"
+) -> float:
+    """
+    Wait until a page is ready instead of sleeping for a fixed time.
+
+    Every requested signal must hold: the network has gone idle, the number of
+    elements matching selector is non-zero and has stopped changing for
+    stable_ms, and predicate(page) is true. timeout_ms caps the whole wait.
+    Returns the seconds actually spent waiting.
+    """
+    start = time.monotonic()
+    deadline = start + timeout_ms / 1000
+    reason = 'ready'
+
+    if network_idle:
+        try:
+            page.wait_for_load_state('networkidle', timeout=timeout_ms)
+        except PlaywrightTimeoutError:
+            reason = 'timeout'
+
+    if selector or predicate:
+        reason = 'timeout'
+        last_count = None
+        stable_since = None
+
+        while time.monotonic() < deadline:
+            ready = True
+
+            if selector:
+                count = page.locator(selector).count()
+                now = time.monotonic()
+                if count != last_count:
+                    last_count = count
+                    stable_since = now
+                if count == 0 or (now - stable_since) * 1000 < stable_ms:
+                    ready = False
+
+            if ready and predicate and not predicate(page):
+                ready = False
+
+            if ready:
+                reason = 'ready'
+                break
+
+            page.wait_for_timeout(poll_ms)
+
+    elapsed = time.monotonic() - start
+    with _lock:
+        _stats['waits'] += 1
+        _stats['total_seconds'] += elapsed
+        _stats['max_seconds'] = max(_stats['max_seconds'], elapsed)
+        if reason == 'timeout':
+            _stats['timeouts'] += 1
+
+    print(f"Wait for {label}: {reason} after {elapsed:.2f}s (cap {timeout_ms / 1000:.1f}s)")
+    return elapsed
+
+def wait_metrics() -> Dict:
+    """
+    Aggregate readiness-wait timings since startup
+    """
+    with _lock:
+        waits = _stats['waits']
+        return {
+            'waits': waits,
+            'timeouts': _stats['timeouts'],
+            'avg_seconds': round(_stats['total_seconds'] / waits, 3) if waits else 0.0,
+            'max_seconds': round(_stats['max_seconds'], 3)
+        }
@@ -1,7 +1,30 @@
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout, as_completed
+import os
 import re
+import time
 from app.services.web_search import web_search
 from app.services.ebay_api import ebay_api
+from app.services.research_cache import research_cache
+
+# Per-source deadlines (seconds) for a single research call
+SEARCH_TIMEOUT = float(os.getenv("RESEARCH_SEARCH_TIMEOUT", "8"))
+EBAY_TIMEOUT = float(os.getenv("RESEARCH_EBAY_TIMEOUT", "10"))
+
+# Shared by all research calls; one call issues up to 8 requests, so size this
+# for ANALYZE_RESEARCH_CONCURRENCY calls at once or queued requests eat into the timeouts
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("RESEARCH_FANOUT_WORKERS", "32")),
+    thread_name_prefix="research"
+)
+
+EMPTY_EBAY_STATS = {
+    'average_price': 0,
+    'min_price': 0,
+    'max_price': 0,
+    'num_sold': 0,
+    'price_range': "No data available"
+}
 
 class PriceResearchService:
     def __init__(self):
@@ -11,9 +34,11 @@ class PriceResearchService:
             'forums': True
         }
     
-    def research_item_value(self, title: str, description: str = None) -> Dict:
+    def research_item_value(self, title: str, description: str = None, on_source: Callable[[str, object], None] = None) -> Dict:
         """
-        Comprehensive price research across multiple sources
+        Comprehensive price research across multiple sources.
+        on_source(source, result) is called as each source answers (not
+        when the whole set comes from cache).
         """
         research_data = {
             'item_name': title,
@@ -22,41 +47,84 @@ class PriceResearchService:
             'forum_discussions': [],
             'price_summary': {},
             'market_insights': [],
-            'recommendations': {}
+            'recommendations': {},
+            'sources': {}
         }
         
         # Clean up the title for better search results
         search_query = self._clean_search_query(title)
         
-        # 1. Get eBay sold listings data
+        # Source results are cached by normalized query; only complete sets are stored
+        sources = self._lookup_sources(search_query, on_source)
+        results, missing = sources['results'], sources['missing']
+        research_data['sources'] = {'answered': sorted(results), 'missing': missing}
+        
+        ebay_stats = results.get('ebay') or dict(EMPTY_EBAY_STATS)
+        research_data['ebay_data'] = ebay_stats
+        if ebay_stats['num_sold'] > 0:
+            research_data['market_insights'].append(
+                f"Found {ebay_stats['num_sold']} sold listings on eBay"
+            )
+            research_data['market_insights'].append(
+                f"eBay price range: {ebay_stats['price_range']}"
+            )
+        
+        # Keep the sequential ordering: general results first, then marketplaces, then forums
+        research_data['web_results'] = (results.get('web') or [])[:5]
+        for i in range(3):
+            research_data['web_results'].extend(results.get(f'marketplace_{i}') or [])
+            research_data['forum_discussions'].extend(results.get(f'forum_{i}') or [])
+        
+        if missing:
+            research_data['market_insights'].append(
+                f"Incomplete research: no response from {', '.join(missing)}"
+            )
+        
+        # 4. Extract price mentions from all results
+        all_prices = self._extract_prices_from_results(research_data)
+        
+        # 5. Generate price summary
+        research_data['price_summary'] = self._generate_price_summary(all_prices, ebay_stats)
+        
+        # 6. Generate recommendations
+        research_data['recommendations'] = self._generate_recommendations(
+            research_data['price_summary'],
+            title,
+            description
+        )
+        
+        return research_data
+    
+    def _lookup_sources(self, search_query: str, on_source: Callable[[str, object], None] = None) -> Dict:
+        return research_cache.get_or_fetch(
+            [search_query, self.sources],
+            lambda: self._fetch_sources(search_query, on_source),
+            cacheable=lambda sources: not sources['missing']
+        )
+    
+    def _fetch_sources(self, search_query: str, on_source: Callable[[str, object], None] = None) -> Dict:
+        """
+        Query eBay and every web/forum search concurrently
+        """
+        # Issue every source query at once; each result is waited on for at
+        # most its source's timeout, all measured from the same start time
+        started = time.monotonic()
+        futures = {}
+        
+        # 1. eBay sold listings data
         if self.sources['ebay']:
-            ebay_stats = ebay_api.get_sold_prices_stats(search_query)
-            research_data['ebay_data'] = ebay_stats
-            
-            if ebay_stats['num_sold'] > 0:
-                research_data['market_insights'].append(
-                    f"Found {ebay_stats['num_sold']} sold listings on eBay"
-                )
-                research_data['market_insights'].append(
-                    f"eBay price range: {ebay_stats['price_range']}"
-                )
-        
-        # 2. General web search for pricing
+            futures['ebay'] = self._submit(started, 'ebay', ebay_api.get_sold_prices_stats, search_query)
+        
+        # 2. General web search for pricing, plus specific marketplaces
         if self.sources['web_search']:
-            # Search for general pricing information
-            price_results = web_search.search(f"{search_query} price value worth")
-            research_data['web_results'] = price_results[:5]
-            
-            # Search for specific marketplaces
+            futures['web'] = self._submit(started, 'web', web_search.search, f"{search_query} price value worth")
             marketplace_searches = [
                 f"{search_query} site:etsy.com sold",
                 f"{search_query} site:mercari.com sold",
                 f"{search_query} site:amazon.com price"
             ]
-            
-            for marketplace_query in marketplace_searches:
-                results = web_search.search(marketplace_query, num_results=3)
-                research_data['web_results'].extend(results)
+            for i, marketplace_query in enumerate(marketplace_searches):
+                futures[f'marketplace_{i}'] = self._submit(started, f'marketplace_{i}', web_search.search, marketplace_query, num_results=3)
         
         # 3. Search forums and collector communities
         if self.sources['forums']:
@@ -65,25 +133,60 @@ class PriceResearchService:
                 f"{search_query} site:collectorsweekly.com",
                 f"{search_query} forum discussion price"
             ]
-            
-            for forum_query in forum_searches:
-                results = web_search.search(forum_query, num_results=3)
-                research_data['forum_discussions'].extend(results)
+            for i, forum_query in enumerate(forum_searches):
+                futures[f'forum_{i}'] = self._submit(started, f'forum_{i}', web_search.search, forum_query, num_results=3)
         
-        # 4. Extract price mentions from all results
-        all_prices = self._extract_prices_from_results(research_data)
-        
-        # 5. Generate price summary
-        research_data['price_summary'] = self._generate_price_summary(all_prices, ebay_stats)
+        results = self._collect(futures, started, on_source)
+        return {
+            'results': results,
+            'missing': [source for source in futures if source not in results]
+        }
+    
+    def _submit(self, started: float, source: str, fn: Callable, *args, **kwargs) -> Future:
+        """
+        Run a source lookup on the shared executor with whatever is left of
+        the source's deadline as its HTTP budget, so a lookup given up on
+        doesn't keep retrying and holding a worker
+        """
+        def call():
+            return fn(*args, budget=max(0.1, started + self._timeout(source) - time.monotonic()), **kwargs)
+        return _executor.submit(call)
+    
+    def _collect(self, futures: Dict[str, Future], started: float, on_source: Callable[[str, object], None] = None) -> Dict:
+        """
+        Gather source results as they complete, giving each source until its
+        own deadline. Sources that time out or fail are left out so the rest
+        can be used.
+        """
+        results = {}
+        if not futures:
+            return results
+        source_of = {future: source for source, future in futures.items()}
+        deadline = max(self._timeout(source) for source in futures)
         
-        # 6. Generate recommendations
-        research_data['recommendations'] = self._generate_recommendations(
-            research_data['price_summary'],
-            title,
-            description
-        )
+        try:
+            for future in as_completed(source_of, timeout=max(0, started + deadline - time.monotonic())):
+                source = source_of[future]
+                if time.monotonic() - started > self._timeout(source):
+                    continue  # reported as timed out below
+                try:
+                    results[source] = future.result()
+                except Exception as e:
+                    print(f"Price research: {source} failed: {e}")
+                    continue
+                if on_source:
+                    on_source(source, results[source])
+        except FutureTimeout:
+            pass
         
-        return research_data
+        for source, future in futures.items():
+            if source not in results and (not future.done() or future.exception() is None):
+                print(f"Price research: {source} timed out after {self._timeout(source)}s")
+                future.cancel()
+        return results
+    
+    def _timeout(self, source: str) -> float:
+        return EBAY_TIMEOUT if source == 'ebay' else SEARCH_TIMEOUT
     
     def _clean_search_query(self, title: str) -> str:
         """
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+import time
+from typing import Dict
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: refills at `rate` tokens per second up to
+    `capacity`, so short bursts are allowed but the sustained rate is capped.
+    One instance is shared by every thread (and task) calling an API.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._stats = {"acquired": 0, "throttled": 0, "timeouts": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0}
+
+    def acquire(self, timeout: float = None) -> bool:
+        """
+        Take one token, sleeping until one is available.
+        Returns False if that would take longer than timeout seconds.
+        """
+        started = time.monotonic()
+        while True:
+            delay = self._try_take(started, timeout)
+            if delay is None:
+                return True
+            if delay < 0:
+                return False
+            time.sleep(delay)
+
+    async def acquire_async(self, timeout: float = None) -> bool:
+        started = time.monotonic()
+        while True:
+            delay = self._try_take(started, timeout)
+            if delay is None:
+                return True
+            if delay < 0:
+                return False
+            await asyncio.sleep(delay)
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            self._refill()
+            stats = dict(self._stats)
+            stats["available"] = round(self._tokens, 2)
+        stats["rate_per_second"] = self.rate
+        stats["capacity"] = self.capacity
+        stats["wait_seconds"] = round(stats["wait_seconds"], 3)
+        stats["max_wait_seconds"] = round(stats["max_wait_seconds"], 3)
+        return stats
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _try_take(self, started: float, timeout: float):
+        """
+        None once a token is taken, else seconds to sleep before retrying (-1 on timeout)
+        """
+        with self._lock:
+            self._refill()
+            now = time.monotonic()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                waited = now - started
+                self._stats["acquired"] += 1
+                if waited > 0.001:
+                    self._stats["throttled"] += 1
+                    self._stats["wait_seconds"] += waited
+                    self._stats["max_wait_seconds"] = max(self._stats["max_wait_seconds"], waited)
+                return None
+            delay = (1 - self._tokens) / self.rate
+            if timeout is not None and now - started + delay > timeout:
+                self._stats["timeouts"] += 1
+                return -1
+            return delay
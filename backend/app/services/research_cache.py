@@ -0,0 +1,240 @@
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict
+from dotenv import load_dotenv
+from sqlalchemy import delete
+from app.database import SessionLocal
+from app.models.cache_entry import CacheEntry
+
+load_dotenv()
+
+CACHE_ENABLED = os.getenv("RESEARCH_CACHE_ENABLED", "true").lower() != "false"
+MEMORY_ENTRIES = int(os.getenv("RESEARCH_CACHE_MEMORY_ENTRIES", "2000"))
+# Seconds between deletes of a namespace's rows that are too old to be served
+PRUNE_INTERVAL = int(os.getenv("RESEARCH_CACHE_PRUNE_INTERVAL", "3600"))
+
+# Stale entries are refreshed in the background, a few at a time
+_refresh_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cache-refresh")
+
+def normalize_query(query: str) -> str:
+    return ' '.join(query.lower().split())
+
+class TTLCache:
+    """
+    Two-tier cache for paid lookups: an in-process LRU in front of the
+    cache_entries table, so results survive restarts and are shared between
+    processes.
+
+    Entries younger than ttl are served as-is. Entries up to stale_ttl past
+    that are still served, but trigger one background refresh. Anything
+    older is fetched synchronously. Results rejected by `cacheable` (empty
+    or partial responses, by default empty) are returned but not stored.
+    Rows past ttl + stale_ttl can never be served again; writes delete them
+    at most once every PRUNE_INTERVAL.
+    """
+
+    def __init__(self, namespace: str, ttl: int, stale_ttl: int, max_entries: int = MEMORY_ENTRIES):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._memory = OrderedDict()  # key -> (value, fetched_at epoch seconds)
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._last_prune = 0.0
+        self._stats = {
+            "memory_hits": 0,
+            "db_hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "forced": 0,
+            "store_errors": 0,
+            "pruned": 0
+        }
+
+    def get_or_fetch(
+        self,
+        parts: list,
+        fetch: Callable[[], Any],
+        cacheable: Callable[[Any], bool] = bool,
+        force: bool = False
+    ) -> Any:
+        """
+        Cached value for parts, else fetch() (stored if cacheable).
+        force skips the lookup and replaces whatever was cached.
+        """
+        if not CACHE_ENABLED:
+            return fetch()
+
+        key = self._key(parts)
+        if force:
+            self._count("forced")
+        entry = None if force else self._lookup(key)
+        if entry is not None:
+            value, fetched_at = entry
+            age = time.time() - fetched_at
+            if age <= self.ttl:
+                return copy.deepcopy(value)
+            if age <= self.ttl + self.stale_ttl:
+                self._count("stale_hits")
+                self._refresh_later(key, fetch, cacheable)
+                return copy.deepcopy(value)
+
+        self._count("misses")
+        value = fetch()
+        if cacheable(value):
+            self._store(key, value)
+        return value
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        hits = stats["memory_hits"] + stats["db_hits"]
+        lookups = hits + stats["misses"]
+        stats["hit_rate"] = round(hits / lookups, 3) if lookups else None
+        stats["ttl_seconds"] = self.ttl
+        stats["stale_seconds"] = self.stale_ttl
+        return stats
+
+    def _key(self, parts: list) -> str:
+        normalized = [normalize_query(p) if isinstance(p, str) else p for p in parts]
+        raw = json.dumps([self.namespace, *normalized], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _count(self, stat: str):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def _lookup(self, key: str):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return entry
+
+        try:
+            with SessionLocal() as db:
+                row = db.get(CacheEntry, key)
+                if row is None:
+                    return None
+                entry = (row.value, _as_utc(row.fetched_at).timestamp())
+        except Exception as e:
+            print(f"Cache read failed for {self.namespace}: {e}")
+            return None
+
+        self._count("db_hits")
+        self._remember(key, entry)
+        return entry
+
+    def _store(self, key: str, value: Any):
+        fetched_at = datetime.now(timezone.utc)
+        self._remember(key, (copy.deepcopy(value), fetched_at.timestamp()))
+        try:
+            with SessionLocal() as db:
+                db.merge(CacheEntry(key=key, namespace=self.namespace, value=value, fetched_at=fetched_at))
+                db.commit()
+        except Exception as e:
+            # Usually a concurrent insert of the same key; the memory tier still has it
+            self._count("store_errors")
+            print(f"Cache write failed for {self.namespace}: {e}")
+        self._prune_if_due()
+
+    def prune(self) -> int:
+        """
+        Delete this namespace's rows too old to be served, even stale.
+        Returns how many were deleted.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.ttl + self.stale_ttl)
+        with SessionLocal() as db:
+            deleted = db.execute(
+                delete(CacheEntry)
+                .where(CacheEntry.namespace == self.namespace, CacheEntry.fetched_at < cutoff)
+            ).rowcount
+            db.commit()
+        with self._lock:
+            self._stats["pruned"] += deleted
+        return deleted
+
+    def _prune_if_due(self):
+        now = time.monotonic()
+        with self._lock:
+            if self._last_prune and now - self._last_prune < PRUNE_INTERVAL:
+                return
+            self._last_prune = now
+        try:
+            deleted = self.prune()
+        except Exception as e:
+            print(f"Cache prune failed for {self.namespace}: {e}")
+            return
+        if deleted:
+            print(f"Pruned {deleted} expired {self.namespace} cache entries")
+
+    def _remember(self, key: str, entry: tuple):
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _refresh_later(self, key: str, fetch: Callable[[], Any], cacheable: Callable[[Any], bool]):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                value = fetch()
+                if cacheable(value):
+                    self._store(key, value)
+                self._count("refreshes")
+            except Exception as e:
+                print(f"Background refresh failed for {self.namespace}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        _refresh_executor.submit(refresh)
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+# Per-source caches
+search_cache = TTLCache(
+    "web_search",
+    ttl=int(os.getenv("CACHE_TTL_WEB_SEARCH", str(24 * 3600))),
+    stale_ttl=int(os.getenv("CACHE_STALE_WEB_SEARCH", str(72 * 3600)))
+)
+ebay_cache = TTLCache(
+    "ebay_sold",
+    ttl=int(os.getenv("CACHE_TTL_EBAY", str(6 * 3600))),
+    stale_ttl=int(os.getenv("CACHE_STALE_EBAY", str(24 * 3600)))
+)
+research_cache = TTLCache(
+    "price_research",
+    ttl=int(os.getenv("CACHE_TTL_RESEARCH", str(6 * 3600))),
+    stale_ttl=int(os.getenv("CACHE_STALE_RESEARCH", str(24 * 3600)))
+)
+# Model responses, keyed by a hash of the full request; never served stale
+analysis_cache = TTLCache(
+    "llm_analysis",
+    ttl=int(os.getenv("CACHE_TTL_ANALYSIS", str(7 * 24 * 3600))),
+    stale_ttl=0
+)
+
+def cache_metrics() -> Dict:
+    return {
+        cache.namespace: cache.metrics()
+        for cache in (research_cache, search_cache, ebay_cache, analysis_cache)
+    }
@@ -0,0 +1,108 @@
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Optional
+from dotenv import load_dotenv
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from app.database import SessionLocal
+from app.models.research_snapshot import ResearchSnapshot
+from app.services.price_research import price_research
+
+load_dotenv()
+
+# Snapshots older than this are re-researched on next use
+SNAPSHOT_TTL = int(os.getenv("RESEARCH_SNAPSHOT_TTL", str(6 * 3600)))
+# Shorter TTL for snapshots where some sources timed out or failed, so they get another try soon
+INCOMPLETE_SNAPSHOT_TTL = int(os.getenv("RESEARCH_SNAPSHOT_INCOMPLETE_TTL", "600"))
+# Versions kept per auction
+SNAPSHOT_KEEP = int(os.getenv("RESEARCH_SNAPSHOT_KEEP", "5"))
+
+def get_research(
+    auction_id: int,
+    title: str,
+    description: str = None,
+    refresh: bool = False,
+    on_source: Callable[[str, object], None] = None
+) -> tuple[Dict, Dict]:
+    """
+    Market research for an auction, from its latest snapshot when that is
+    fresh and was taken for the same title (snapshots missing a source go
+    stale after INCOMPLETE_SNAPSHOT_TTL); otherwise research again and
+    save the result as the next version.
+    Returns (research_data, snapshot info: version, created_at, reused).
+    Opens its own sessions, so it is safe from any thread.
+    """
+    if not refresh:
+        latest = latest_snapshot(auction_id)
+        if latest and latest.title == title and _age(latest) <= _ttl(latest):
+            return latest.data, _info(latest, reused=True)
+
+    data = price_research.research_item_value(title, description, on_source=on_source)
+    snapshot = _save(auction_id, title, data)
+    return data, _info(snapshot, reused=False)
+
+def latest_snapshot(auction_id: int) -> Optional[ResearchSnapshot]:
+    with SessionLocal() as db:
+        return db.scalars(
+            select(ResearchSnapshot)
+            .where(ResearchSnapshot.auction_id == auction_id)
+            .order_by(ResearchSnapshot.version.desc())
+            .limit(1)
+        ).first()
+
+def _save(auction_id: int, title: str, data: Dict) -> ResearchSnapshot:
+    sources = data.get('sources', {})
+    for _ in range(3):
+        with SessionLocal() as db:
+            latest_version = db.scalar(
+                select(ResearchSnapshot.version)
+                .where(ResearchSnapshot.auction_id == auction_id)
+                .order_by(ResearchSnapshot.version.desc())
+                .limit(1)
+            ) or 0
+            snapshot = ResearchSnapshot(
+                auction_id=auction_id,
+                version=latest_version + 1,
+                title=title,
+                data=data,
+                sources=sources
+            )
+            db.add(snapshot)
+            try:
+                db.flush()
+            except IntegrityError:
+                # Another request saved this version first; take the next one
+                db.rollback()
+                continue
+            db.execute(
+                delete(ResearchSnapshot)
+                .where(ResearchSnapshot.auction_id == auction_id)
+                .where(ResearchSnapshot.version <= snapshot.version - SNAPSHOT_KEEP)
+            )
+            db.commit()
+            db.refresh(snapshot)
+            return snapshot
+    raise RuntimeError(f"Could not save research snapshot for auction {auction_id}")
+
+def _age(snapshot: ResearchSnapshot) -> float:
+    created_at = snapshot.created_at
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)  # SQLite drops the zone
+    return (datetime.now(timezone.utc) - created_at).total_seconds()
+
+def _ttl(snapshot: ResearchSnapshot) -> int:
+    # 'missing' lists every source that timed out or raised; a snapshot
+    # without that record can't be shown complete, so it is treated as incomplete
+    sources = snapshot.sources or {}
+    if 'missing' not in sources or sources['missing']:
+        return INCOMPLETE_SNAPSHOT_TTL
+    return SNAPSHOT_TTL
+
+def _info(snapshot: ResearchSnapshot, reused: bool) -> Dict:
+    return {
+        'version': snapshot.version,
+        'created_at': snapshot.created_at,
+        'stale_after': snapshot.created_at + timedelta(seconds=_ttl(snapshot)),
+        'sources': snapshot.sources,
+        'reused': reused
+    }
@@ -0,0 +1,121 @@
+import os
+import threading
+from typing import Dict
+from urllib.parse import urlparse
+from dotenv import load_dotenv
+
+load_dotenv()
+
+def _env_list(name: str, default: str) -> list:
+    return [value.strip().lower() for value in os.getenv(name, default).split(",") if value.strip()]
+
+BLOCK_RESOURCES = os.getenv("SCRAPE_BLOCK_RESOURCES", "true").lower() == "true"
+# The scrapers only read the DOM, so images, fonts, stylesheets and media are dropped
+ALLOWED_RESOURCE_TYPES = _env_list("SCRAPE_ALLOWED_RESOURCE_TYPES", "document,script,xhr,fetch")
+# Empty means any domain not explicitly blocked
+ALLOWED_DOMAINS = _env_list("SCRAPE_ALLOWED_DOMAINS", "")
+BLOCKED_DOMAINS = _env_list(
+    "SCRAPE_BLOCKED_DOMAINS",
+    "google-analytics.com,googletagmanager.com,doubleclick.net,googlesyndication.com,"
+    "facebook.net,facebook.com,hotjar.com,newrelic.com,nr-data.net,bing.com,criteo.com,"
+    "pinterest.com,tiktok.com,clarity.ms"
+)
+
+_lock = threading.Lock()
+_totals = {
+    'pages': 0,
+    'bytes_transferred': 0,
+    'requests_allowed': 0,
+    'requests_blocked': 0,
+    'blocked_by_type': {}
+}
+
+def _matches(host: str, domains: list) -> bool:
+    return any(host == domain or host.endswith(f".{domain}") for domain in domains)
+
+class ResourceFilter:
+    """
+    Per-page request interception: aborts requests outside the resource-type
+    and domain allowlists and counts the bytes the page actually downloaded.
+    Blocked requests are never fetched, so they are counted rather than sized.
+    """
+
+    def __init__(self, allowed_types: list = None, allowed_domains: list = None, blocked_domains: list = None, enabled: bool = BLOCK_RESOURCES):
+        self.enabled = enabled
+        self.allowed_types = ALLOWED_RESOURCE_TYPES if allowed_types is None else allowed_types
+        self.allowed_domains = ALLOWED_DOMAINS if allowed_domains is None else allowed_domains
+        self.blocked_domains = BLOCKED_DOMAINS if blocked_domains is None else blocked_domains
+        self.bytes_transferred = 0
+        self.requests_allowed = 0
+        self.blocked_by_type = {}
+
+    def attach(self, page):
+        if self.enabled:
+            page.route("**/*", self._handle_route)
+        page.on("requestfinished", self._on_request_finished)
+
+    def is_allowed(self, resource_type: str, url: str) -> bool:
+        host = (urlparse(url).hostname or '').lower()
+        if resource_type not in self.allowed_types:
+            return False
+        if _matches(host, self.blocked_domains):
+            return False
+        if self.allowed_domains and not _matches(host, self.allowed_domains):
+            return False
+        return True
+
+    def _handle_route(self, route):
+        request = route.request
+        if self.is_allowed(request.resource_type, request.url):
+            route.continue_()
+        else:
+            self.blocked_by_type[request.resource_type] = self.blocked_by_type.get(request.resource_type, 0) + 1
+            route.abort()
+
+    def _on_request_finished(self, request):
+        self.requests_allowed += 1
+        try:
+            sizes = request.sizes()
+            self.bytes_transferred += sizes['responseHeadersSize'] + sizes['responseBodySize']
+        except Exception:
+            # Size info isn't available for every request (e.g. served from memory)
+            pass
+
+    def report(self, label: str) -> Dict:
+        """
+        Log this page's transfer summary and add it to the process totals
+        """
+        blocked = sum(self.blocked_by_type.values())
+        with _lock:
+            _totals['pages'] += 1
+            _totals['bytes_transferred'] += self.bytes_transferred
+            _totals['requests_allowed'] += self.requests_allowed
+            _totals['requests_blocked'] += blocked
+            for resource_type, count in self.blocked_by_type.items():
+                _totals['blocked_by_type'][resource_type] = _totals['blocked_by_type'].get(resource_type, 0) + count
+
+        breakdown = ", ".join(f"{t}: {c}" for t, c in sorted(self.blocked_by_type.items())) or "none"
+        print(f"Transfer for {label}: {self.bytes_transferred / 1024:.1f} KB over {self.requests_allowed} requests, "
+              f"blocked {blocked} requests ({breakdown})")
+        return {
+            'bytes_transferred': self.bytes_transferred,
+            'requests_allowed': self.requests_allowed,
+            'requests_blocked': blocked,
+            'blocked_by_type': dict(self.blocked_by_type)
+        }
+
+def bandwidth_metrics() -> Dict:
+    """
+    Transfer totals across all scraped pages since startup
+    """
+    with _lock:
+        pages = _totals['pages']
+        return {
+            'enabled': BLOCK_RESOURCES,
+            'pages': pages,
+            'bytes_transferred': _totals['bytes_transferred'],
+            'avg_bytes_per_page': round(_totals['bytes_transferred'] / pages) if pages else 0,
+            'requests_allowed': _totals['requests_allowed'],
+            'requests_blocked': _totals['requests_blocked'],
+            'blocked_by_type': dict(_totals['blocked_by_type'])
+        }
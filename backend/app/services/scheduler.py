@@ -0,0 +1,248 @@
+import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict
+from dotenv import load_dotenv
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select, update, and_, or_, case
+from sqlalchemy.exc import IntegrityError
+from app.database import SessionLocal
+from app.models.auction import Auction, OPPORTUNITY_RATIO
+from app.models.scheduler_task import SchedulerTask
+from app.services.auction_pipeline import apply_details, scrape_limit
+from app.services.detail_scraper import scrape_auction_details
+from app.services.ingest import crawl_into_db
+from app.services.jobs import job_queue, JOB_ANALYZE
+
+load_dotenv()
+
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() != "false"
+CRAWL_INTERVAL = int(os.getenv("SCHEDULER_CRAWL_INTERVAL", "1800"))
+CRAWL_MAX_PAGES = int(os.getenv("SCHEDULER_CRAWL_MAX_PAGES", "10"))
+REFRESH_INTERVAL = int(os.getenv("SCHEDULER_REFRESH_INTERVAL", "60"))
+# Auctions re-polled per refresh run, and detail fetches in flight at once
+REFRESH_BATCH = int(os.getenv("SCHEDULER_REFRESH_BATCH", "50"))
+REFRESH_CONCURRENCY = int(os.getenv("SCHEDULER_CONCURRENCY", "4"))
+# Poll interval for tracked auctions ending later than the last tier, or at an unknown time
+REFRESH_IDLE_INTERVAL = int(os.getenv("SCHEDULER_REFRESH_IDLE_INTERVAL", str(6 * 3600)))
+
+# (ends within seconds, re-poll every seconds), most urgent first
+REFRESH_TIERS = [
+    (10 * 60, 60),
+    (60 * 60, 5 * 60),
+    (24 * 3600, 30 * 60)
+]
+
+_executor = ThreadPoolExecutor(max_workers=REFRESH_CONCURRENCY, thread_name_prefix="scheduler-refresh")
+
+def refresh_queue(now: datetime):
+    """
+    Select of tracked (watchlisted or high-margin) auctions still open and
+    due a refresh, most urgent first: by end-time tier, then by margin.
+    An auction is due once its refreshed_at is older than its tier's
+    interval, so polling speeds up as the end nears. Served by the ends_at
+    and refreshed_at indexes.
+    """
+    margin = Auction.estimated_value - Auction.price_value
+    due = [Auction.refreshed_at.is_(None)]
+    tiers = []
+    for rank, (within, interval) in enumerate(REFRESH_TIERS):
+        closes_within = Auction.ends_at <= now + timedelta(seconds=within)
+        due.append(and_(closes_within, Auction.refreshed_at <= now - timedelta(seconds=interval)))
+        tiers.append((closes_within, rank))
+    due.append(Auction.refreshed_at <= now - timedelta(seconds=REFRESH_IDLE_INTERVAL))
+    urgency = case(*tiers, else_=len(REFRESH_TIERS))
+
+    return (
+        select(Auction.id, Auction.auction_url)
+        .where(or_(
+            Auction.is_watchlisted.is_(True),
+            Auction.estimated_value - OPPORTUNITY_RATIO * Auction.price_value > 0
+        ))
+        .where(or_(Auction.ends_at.is_(None), Auction.ends_at > now))
+        .where(or_(*due))
+        .order_by(urgency, margin.desc().nullslast(), Auction.ends_at, Auction.id)
+    )
+
+def refresh_tracked_auctions(limit: int = REFRESH_BATCH) -> Dict:
+    """
+    Re-fetch details (price, bids, end time) for the top of the refresh
+    queue. Auctions fetched for the first time that have no analysis yet are
+    queued for one.
+    """
+    now = _utcnow()
+    with SessionLocal() as db:
+        due = db.execute(refresh_queue(now).limit(limit)).all()
+
+    def fetch(auction_url):
+        with scrape_limit:
+            return scrape_auction_details(auction_url)
+
+    fetched = list(_executor.map(fetch, [auction_url for _, auction_url in due]))
+
+    stats = {'due': len(due), 'refreshed': 0, 'failed': 0, 'queued_for_analysis': 0}
+    with SessionLocal() as db:
+        auctions = {
+            auction.id: auction
+            for auction in db.scalars(select(Auction).where(Auction.id.in_([auction_id for auction_id, _ in due])))
+        }
+        to_analyze = []
+        for (auction_id, _), details in zip(due, fetched):
+            auction = auctions.get(auction_id)
+            if auction is None:
+                continue
+            if not details:
+                # Count the attempt so a failing page waits its turn instead of retrying every run
+                auction.refreshed_at = now
+                stats['failed'] += 1
+                continue
+            if not auction.details_scraped and auction.estimated_value is None:
+                to_analyze.append(auction_id)
+            apply_details(auction, details)
+            stats['refreshed'] += 1
+        db.commit()
+
+        if to_analyze:
+            job_queue.submit(db, to_analyze, kind=JOB_ANALYZE)
+            stats['queued_for_analysis'] = len(to_analyze)
+
+    print(f"Refreshed {stats['refreshed']} of {stats['due']} due auctions "
+          f"({stats['failed']} failed, {stats['queued_for_analysis']} queued for analysis)")
+    return stats
+
+def incremental_crawl() -> Dict:
+    with SessionLocal() as db:
+        result = crawl_into_db(db, max_pages=CRAWL_MAX_PAGES)
+    return {'inserted': result['inserted'], 'updated': result['updated'], 'scrape': result['scrape']}
+
+class Scheduler:
+    """
+    Runs recurring ingestion tasks on an interval, one thread per task.
+
+    Each task's schedule and last outcome live in the scheduler_tasks table,
+    so they survive restarts. A process claims a run with a conditional
+    UPDATE that pushes next_run_at a lease into the future, so the API and a
+    separate worker can share the database without doubling up; if the
+    claiming process dies, the run becomes due again once the lease passes.
+    Intervals are jittered so processes and tasks don't fire in lockstep.
+    """
+
+    def __init__(self, jitter: float = 0.1, lease_seconds: int = 3600, poll_interval: float = 15):
+        self.jitter = jitter
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.tasks = {}  # name -> (func, interval seconds)
+        self._stop = threading.Event()
+        self._threads = []
+
+    def add_task(self, name: str, func: Callable[[], Dict], interval: int):
+        self.tasks[name] = (func, interval)
+
+    def start(self):
+        if self._threads:
+            return
+        self._stop.clear()
+        self._ensure_rows()
+        self._threads = [
+            threading.Thread(target=self._loop, args=(name,), name=f"scheduler-{name}", daemon=True)
+            for name in self.tasks
+        ]
+        for thread in self._threads:
+            thread.start()
+        print(f"Scheduler started with tasks: {', '.join(self.tasks)}")
+
+    def stop(self, timeout: float = 10):
+        """
+        Stop scheduling. A run in progress finishes in the background; its
+        lease makes it due again if the process exits first.
+        """
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+        print("Scheduler stopped")
+
+    def metrics(self) -> Dict:
+        with SessionLocal() as db:
+            rows = db.scalars(select(SchedulerTask)).all()
+            return {row.name: jsonable_encoder(row) for row in rows}
+
+    def _ensure_rows(self):
+        with SessionLocal() as db:
+            for name in self.tasks:
+                if db.get(SchedulerTask, name) is None:
+                    db.add(SchedulerTask(name=name, next_run_at=_utcnow()))
+                    try:
+                        db.commit()
+                    except IntegrityError:
+                        db.rollback()  # Another process created it
+
+    def _loop(self, name: str):
+        func, interval = self.tasks[name]
+        while not self._stop.is_set():
+            try:
+                claimed = self._claim(name)
+            except Exception as e:
+                print(f"Error claiming scheduler task {name}: {e}")
+                claimed = False
+
+            if claimed:
+                self._run(name, func, interval)
+            self._stop.wait(min(self.poll_interval, interval))
+
+    def _claim(self, name: str) -> bool:
+        now = _utcnow()
+        with SessionLocal() as db:
+            claimed = db.execute(
+                update(SchedulerTask)
+                .where(SchedulerTask.name == name, SchedulerTask.next_run_at <= now)
+                .values(next_run_at=now + timedelta(seconds=self.lease_seconds), last_started_at=now)
+            )
+            db.commit()
+            return claimed.rowcount == 1
+
+    def _run(self, name: str, func: Callable[[], Dict], interval: int):
+        status, error, result = "succeeded", None, None
+        try:
+            result = func()
+        except Exception as e:
+            print(f"Scheduler task {name} failed: {e}")
+            status, error = "failed", str(e)
+
+        finished = _utcnow()
+        delay = interval * (1 + random.uniform(-self.jitter, self.jitter))
+        with SessionLocal() as db:
+            db.execute(
+                update(SchedulerTask)
+                .where(SchedulerTask.name == name)
+                .values(
+                    next_run_at=finished + timedelta(seconds=delay),
+                    last_finished_at=finished,
+                    last_status=status,
+                    last_error=error,
+                    last_result=jsonable_encoder(result),
+                    runs=SchedulerTask.runs + 1
+                )
+            )
+            db.commit()
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+# Singleton instance
+scheduler = Scheduler(
+    jitter=float(os.getenv("SCHEDULER_JITTER", "0.1")),
+    lease_seconds=int(os.getenv("SCHEDULER_LEASE_SECONDS", "3600"))
+)
+scheduler.add_task("crawl", incremental_crawl, CRAWL_INTERVAL)
+scheduler.add_task("refresh", refresh_tracked_auctions, REFRESH_INTERVAL)
+
+if __name__ == "__main__":
+    # Standalone worker: run with SCHEDULER_ENABLED=false on the API processes
+    scheduler.start()
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        scheduler.stop()
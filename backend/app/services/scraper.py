@@ -1,112 +1,134 @@
 import pandas as pd
-from playwright.sync_api import sync_playwright
-from bs4 import BeautifulSoup
-import requests
-import time
-import re
+import os
+from concurrent.futures import ThreadPoolExecutor
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+from app.services.browser_pool import browser_pool
+from app.services.page_waits import wait_until_ready
+from app.services.html_parser import parse_listing
+from app.services.shopgoodwill_api import shopgoodwill, resolve_backend, SITE_URL
+
+ITEM_SELECTOR = 'div[class*="item-col"]'
+CATEGORIES_URL = f"{SITE_URL}/categories"
+DEFAULT_CATEGORIES = [c.strip() for c in os.getenv("SCRAPE_CATEGORIES", "collectibles").split(",") if c.strip()]
+MAX_PAGES = int(os.getenv("SCRAPE_MAX_PAGES", "50"))
+# How long a listing page may take to show its first tile; a page that shows none is treated as empty
+ITEM_WAIT_MS = int(os.getenv("SCRAPE_ITEM_WAIT_MS", "15000"))
+# Pages in flight at once; more than the browser pool size just queues
+CRAWL_CONCURRENCY = int(os.getenv("SCRAPE_CONCURRENCY", str(browser_pool.size)))
 
 def get_html(url):
-    with sync_playwright() as p:
-        browser = p.chromium.launch(
-            headless=True,
-            args=['--disable-blink-features=AutomationControlled']
-        )
-        
-        context = browser.new_context(
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        )
-        
-        page = context.new_page()
+    def load(page):
         page.goto(url, wait_until='domcontentloaded', timeout=60000)
         
         # Wait for products to load - wait for item containers
-        page.wait_for_selector('div[class*="item-col"]', timeout=30000)
+        try:
+            page.wait_for_selector(ITEM_SELECTOR, timeout=ITEM_WAIT_MS)
+        except PlaywrightTimeoutError:
+            # Past the last listing page there are no tiles; hand back the
+            # empty page so the crawl stops as 'last_page', not 'error'
+            print(f"No item tiles on {url} after {ITEM_WAIT_MS} ms")
+            return page.content()
         
-        # Additional wait to ensure all content is loaded
-        page.wait_for_timeout(5000)
+        # Then wait only until the tile count settles
+        wait_until_ready(page, selector=ITEM_SELECTOR, label=url)
         
-        html = page.content()
-        browser.close()
-        return html
+        return page.content()
+
+    return browser_pool.run(load)
 
 def parse_html(html):
-    soup = BeautifulSoup(html, 'html.parser')
-    
-    # Updated selectors based on the actual website structure
-    products = soup.find_all('div', class_=re.compile(r'item-col'))
-    
-    scraped_data = []
-    for product in products:
-        try:
-            # Find the link element
-            link_elem = product.find('a', href=True)
-            if not link_elem:
-                continue
-                
-            # Extract URL
-            auction_url = link_elem.get('href', '')
-            if not auction_url.startswith('http'):
-                auction_url = f"https://shopgoodwill.com{auction_url}"
-            
-            # Extract title - look for various possible locations
-            title = ''
-            title_elem = product.find(class_=re.compile(r'title|name|feat-item_name'))
-            if title_elem:
-                title = title_elem.text.strip()
-            else:
-                # Try to get title from image alt text
-                img_elem = product.find('img')
-                if img_elem and img_elem.get('alt'):
-                    title = img_elem.get('alt', '').strip()
-            
-            if not title:
-                continue
-                
-            # Extract price
-            price = ''
-            price_elem = product.find(class_=re.compile(r'price|feat-item_price'))
-            if price_elem:
-                price = price_elem.text.strip()
-            else:
-                # Look for any text containing $
-                price_text = product.find(text=re.compile(r'\$[\d,]+\.?\d*'))
-                if price_text:
-                    price = price_text.strip()
-            
-            # Extract image URL
-            image_url = ''
-            img_elem = product.find('img')
-            if img_elem:
-                image_url = img_elem.get('src', '')
-                if not image_url.startswith('http'):
-                    image_url = f"https://shopgoodwill.com{image_url}"
-            
-            # Only add if we have at least title and URL
-            if title and auction_url:
-                scraped_data.append({
-                    'title': title,
-                    'price': price or '$0.00',
-                    'image_url': image_url,
-                    'auction_url': auction_url
-                })
-                
-        except Exception as e:
-            print(f"Error parsing product: {e}")
-            continue
-            
-    return scraped_data
+    return parse_listing(html)
 
 def save_to_csv(data, filename='goodwill_auctions.csv'):
     df = pd.DataFrame(data)
     df.to_csv(filename, index=False)
     print(f"Data saved to {filename}")
 
-def main():
-    url = "https://shopgoodwill.com/categories/collectibles?p=1"
-    print(f"Scraping {url}...")
+def category_url(category: str, page_num: int) -> str:
+    return f"{CATEGORIES_URL}/{category}?p={page_num}"
+
+def scrape_page(url, backend=None):
+    # The live listing grid is rendered client-side, so in 'auto' mode a plain
+    # GET never has tiles; only 'http' (e.g. against a stub server) skips the browser
+    if resolve_backend(backend) == 'http':
+        return parse_html(shopgoodwill.fetch_html(url))
+
     html = get_html(url)
-    data = parse_html(html)
-    print(f"Found {len(data)} products")
+    return parse_html(html)
+
+def crawl(categories=None, on_page=None, known_urls=None, max_pages=None, concurrency=None, backend=None) -> dict:
+    """
+    Walk every listing page of the given categories, keeping several pages in
+    flight at once. Each parsed page is handed to on_page(items) as soon as it
+    is ready (always from the calling thread), so callers can stream results
+    into the database instead of holding the whole crawl in memory.
+
+    A category stops at its first empty or failed page, at max_pages, or at the
+    first page whose auctions are all already in known_urls. backend selects
+    how pages are fetched ('auto', 'http' or 'browser').
+    """
+    backend = resolve_backend(backend)
+    categories = categories or DEFAULT_CATEGORIES
+    max_pages = max_pages or MAX_PAGES
+    concurrency = concurrency or CRAWL_CONCURRENCY
+    known_urls = set(known_urls or ())
+
+    stats = {'pages': 0, 'items': 0, 'new_items': 0, 'categories': {}}
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for category in categories:
+            pages_done = 0
+            stop_reason = 'max_pages'
+            next_page = 1
+
+            while next_page <= max_pages:
+                # Fetch the next window of pages concurrently, then consume in order
+                window = range(next_page, min(next_page + concurrency, max_pages + 1))
+                futures = [(n, executor.submit(scrape_page, category_url(category, n), backend)) for n in window]
+                next_page = window[-1] + 1
+                stop_reason = None
+
+                for page_num, future in futures:
+                    if stop_reason:
+                        future.cancel()
+                        continue
+                    try:
+                        items = future.result()
+                    except Exception as e:
+                        print(f"Error scraping {category} page {page_num}: {e}")
+                        stop_reason = 'error'
+                        continue
+
+                    if not items:
+                        stop_reason = 'last_page'
+                        continue
+
+                    new_urls = {item['auction_url'] for item in items} - known_urls
+                    pages_done += 1
+                    stats['pages'] += 1
+                    stats['items'] += len(items)
+                    stats['new_items'] += len(new_urls)
+                    print(f"{category} page {page_num}: {len(items)} items, {len(new_urls)} new")
+
+                    if on_page:
+                        on_page(items)
+
+                    if not new_urls:
+                        stop_reason = 'no_new_items'
+                        continue
+                    known_urls |= new_urls
+
+                if stop_reason:
+                    break
+
+            stats['categories'][category] = {'pages': pages_done, 'stop_reason': stop_reason or 'max_pages'}
+
+    return stats
+
+def main(categories=None, max_pages=None, backend=None):
+    data = []
+    stats = crawl(categories, on_page=data.extend, max_pages=max_pages, backend=backend)
+    print(f"Found {len(data)} products across {stats['pages']} pages")
     return data
 
 if __name__ == "__main__":
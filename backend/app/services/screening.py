@@ -0,0 +1,70 @@
+import json
+import os
+from typing import Dict, List
+from dotenv import load_dotenv
+from app.models.auction import OPPORTUNITY_RATIO
+from app.services.analysis import client
+
+load_dotenv()
+
+# Cheap first pass: several listings (title, price, low-detail thumbnail) per request
+SCREEN_MODEL = os.getenv("SCREEN_MODEL", "gpt-4o-mini")
+SCREEN_BATCH_SIZE = int(os.getenv("SCREEN_BATCH_SIZE", "10"))
+# Promote an item to full analysis once its screening value clears this multiple of the price
+PROMOTE_RATIO = float(os.getenv("SCREEN_PROMOTE_RATIO", str(OPPORTUNITY_RATIO)))
+
+SCREEN_SYSTEM_PROMPT = """You are an auction appraiser doing a quick first-pass screen of many listings.
+For each listing, estimate what it would resell for from its title, current price and thumbnail only.
+Flag a listing as promising when it is likely worth well above its current price.
+Respond with JSON only: {"items": [{"id": <listing id>, "estimated_value": <number>, "promising": <true|false>, "reason": "<one short sentence>"}]}
+Include every listing exactly once."""
+
+def screen_listings(listings: List[Dict]) -> Dict[int, Dict]:
+    """
+    Appraise a batch of listings in a single chat completion.
+    Each listing needs id, title, price, price_value and image_url.
+    Returns {id: {screen_value, promoted, reason}} for the listings the
+    model answered; raises if the request or its JSON fails.
+    """
+    lines = [
+        f"Listing {listing['id']}: {listing['title']} (current price: {listing['price'] or 'Unknown'})"
+        for listing in listings
+    ]
+    content = [{"type": "text", "text": "Screen these auction listings:\n" + "\n".join(lines)}]
+    for listing in listings:
+        if listing.get('image_url'):
+            content.append({"type": "text", "text": f"Thumbnail for listing {listing['id']}:"})
+            content.append({"type": "image_url", "image_url": {"url": listing['image_url'], "detail": "low"}})
+
+    response = client.chat.completions.create(
+        model=SCREEN_MODEL,
+        messages=[
+            {"role": "system", "content": SCREEN_SYSTEM_PROMPT},
+            {"role": "user", "content": content}
+        ],
+        response_format={"type": "json_object"},
+        max_tokens=100 + 80 * len(listings),
+    )
+    data = json.loads(response.choices[0].message.content)
+
+    by_id = {listing['id']: listing for listing in listings}
+    screened = {}
+    for item in data.get("items", []):
+        try:
+            listing_id = int(item["id"])
+            value = float(item.get("estimated_value") or 0)
+        except (KeyError, TypeError, ValueError):
+            continue
+        listing = by_id.get(listing_id)
+        if listing is None:
+            continue
+
+        # Judge by the numbers when the price is known, else by the model's flag
+        price = listing.get('price_value')
+        promoted = value >= PROMOTE_RATIO * price if price else bool(item.get("promising"))
+        screened[listing_id] = {
+            "screen_value": value,
+            "promoted": promoted,
+            "reason": item.get("reason")
+        }
+    return screened
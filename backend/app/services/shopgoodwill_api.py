@@ -0,0 +1,121 @@
+import os
+import re
+from typing import Dict, Optional
+from dotenv import load_dotenv
+from app.services.browser_pool import USER_AGENT
+from app.services.html_parser import html_to_text
+from app.services.http_client import HttpClient
+
+load_dotenv()
+
+# Both base URLs can point at a local stub server serving recorded responses
+SITE_URL = os.getenv("SHOPGOODWILL_URL", "https://shopgoodwill.com").rstrip('/')
+API_URL = os.getenv("SHOPGOODWILL_API_URL", "https://buyerapi.shopgoodwill.com/api").rstrip('/')
+
+# Fetch backends: 'browser' (Playwright only), 'http' (no browser), 'auto' (buyer API for
+# item details, then browser; listing pages always need the browser)
+FETCH_BACKEND = os.getenv("SCRAPE_BACKEND", "auto")
+FETCH_BACKENDS = ('auto', 'http', 'browser')
+
+class ShopGoodwillClient:
+    """
+    Plain HTTP access to shopgoodwill listing pages and item JSON, used to skip
+    the headless browser when the data is available without rendering.
+    """
+
+    def __init__(self, site_url: str = SITE_URL, api_url: str = API_URL, pool_size: int = 10, timeout: float = 15):
+        self.site_url = site_url
+        self.api_url = api_url
+        self.timeout = timeout
+        self.http = HttpClient("shopgoodwill", headers={'User-Agent': USER_AGENT}, pool_size=pool_size)
+
+    def fetch_html(self, url: str) -> str:
+        """
+        GET a page's server-rendered HTML
+        """
+        response = self.http.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.text
+
+    def get_item_detail(self, auction_url: str) -> Dict:
+        """
+        Fetch an item from the buyer API and map it to the same dict
+        scrape_auction_details builds from the rendered page.
+        Raises if the item can't be fetched or the response lacks a title,
+        price or images, so 'auto' falls back to the browser instead of
+        saving a half-filled item.
+        """
+        item_id = item_id_from_url(auction_url)
+        if not item_id:
+            raise ValueError(f"No item id in {auction_url}")
+
+        response = self.http.get(
+            f"{self.api_url}/ItemDetail/GetItemDetailModelByItemId/{item_id}",
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        item = response.json()
+
+        if not item or not item.get('title'):
+            raise ValueError(f"Item detail response for {item_id} has no title")
+
+        data = {'title': item['title'].strip()}
+
+        if item.get('currentPrice') is not None:
+            data['current_price'] = f"${float(item['currentPrice']):,.2f}"
+        if item.get('numberOfBids') is not None:
+            data['num_bids'] = str(item['numberOfBids'])
+        if item.get('endTime'):
+            data['end_time'] = str(item['endTime'])
+        if item.get('sellerName'):
+            data['seller'] = item['sellerName'].strip()
+
+        # imageUrlString is a ';'-separated list of paths relative to imageServer
+        images = []
+        image_server = (item.get('imageServer') or '').rstrip('/')
+        for path in (item.get('imageUrlString') or '').split(';'):
+            path = path.strip().replace('\\', '/')
+            if not path:
+                continue
+            src = path if path.startswith('http') else f"{image_server}/{path.lstrip('/')}"
+            if src not in images:
+                images.append(src)
+        data['all_images'] = images
+
+        if 'current_price' not in data or not images:
+            raise ValueError(f"Item detail response for {item_id} has no price or images")
+
+        if item.get('description'):
+            data['description_html'] = item['description']
+            data['description_text'] = html_to_text(item['description'])
+
+        item_details = {}
+        for key, label in DETAIL_FIELDS.items():
+            if item.get(key) not in (None, ''):
+                item_details[label] = str(item[key])
+        data['item_details'] = item_details
+
+        return data
+
+# Buyer API fields surfaced in item_details, keyed by their labels on the item page
+DETAIL_FIELDS = {
+    'itemId': 'Item Number',
+    'startTime': 'Start Time',
+    'endTime': 'End Time',
+    'shippingPrice': 'Shipping',
+    'pickupState': 'Pickup Location',
+    'conditionName': 'Condition'
+}
+
+def item_id_from_url(auction_url: str) -> Optional[str]:
+    match = re.search(r'/item/(\d+)', auction_url or '')
+    return match.group(1) if match else None
+
+def resolve_backend(backend: Optional[str]) -> str:
+    backend = backend or FETCH_BACKEND
+    if backend not in FETCH_BACKENDS:
+        raise ValueError(f"Unknown fetch backend '{backend}', expected one of {FETCH_BACKENDS}")
+    return backend
+
+# Singleton instance
+shopgoodwill = ShopGoodwillClient()
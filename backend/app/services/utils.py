@@ -1,4 +1,6 @@
 import re
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
 
 def parse_price(price_str: str) -> float | None:
     """
@@ -8,10 +10,48 @@ def parse_price(price_str: str) -> float | None:
         return None
     
     # Use regex to find the first number (integer or float) in the string
-    match = re.search(r'(\d+\.?\d*)', price_str)
+    match = re.search(r'(\d[\d,]*\.?\d*)', price_str)
     if match:
         try:
-            return float(match.group(1))
+            return float(match.group(1).replace(',', ''))
         except (ValueError, IndexError):
             return None
-    return None 
\ No newline at end of file
+    return None
+
+def parse_bid_count(bids_str: str) -> int | None:
+    """
+    Parses a bid count string (e.g., '5' or '5 bids') and returns the integer value.
+    """
+    if not bids_str:
+        return None
+    
+    match = re.search(r'(\d+)', bids_str)
+    return int(match.group(1)) if match else None
+
+
+def parse_end_time(end_str: str, tz_name: str = "America/Los_Angeles") -> datetime | None:
+    """
+    Parses an auction end time (e.g., '2024-03-10T18:32:00' from the buyer API
+    or '3/10/2024 6:32:00 PM PT' from the item page) and returns it as an aware
+    UTC datetime. Times without an offset are read in the site's time zone.
+    """
+    if not end_str:
+        return None
+
+    value = re.sub(r'\s+(PT|PST|PDT)$', '', end_str.strip())
+    parsed = None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        for fmt in ('%m/%d/%Y %I:%M:%S %p', '%m/%d/%Y %I:%M %p'):
+            try:
+                parsed = datetime.strptime(value, fmt)
+                break
+            except ValueError:
+                continue
+    if parsed is None:
+        return None
+
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=ZoneInfo(tz_name))
+    return parsed.astimezone(timezone.utc)
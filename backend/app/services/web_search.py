@@ -1,23 +1,32 @@
 import os
-import requests
-from typing import List, Dict, Optional
+from typing import List, Dict
 from dotenv import load_dotenv
-import json
+from app.services.http_client import HttpClient
+from app.services.research_cache import search_cache
 
 load_dotenv()
 
 class WebSearchService:
     def __init__(self):
         self.serper_api_key = os.getenv("SERPER_API_KEY")
-        self.base_url = "https://google.serper.dev"
+        self.base_url = os.getenv("SERPER_URL", "https://google.serper.dev").rstrip('/')
+        self.http = HttpClient("serper")
         
-    def search(self, query: str, num_results: int = 10) -> List[Dict]:
+    def search(self, query: str, num_results: int = 10, budget: float = None) -> List[Dict]:
         """
-        Perform a web search using Serper API
+        Perform a web search using Serper API, served from cache when possible.
+        Raises when the search couldn't be made (no API key, HTTP error), so
+        callers can tell that from a search with no results. budget caps the
+        seconds spent on the request, retries included.
         """
+        return search_cache.get_or_fetch(
+            [query, num_results],
+            lambda: self._search(query, num_results, budget)
+        )
+    
+    def _search(self, query: str, num_results: int, budget: float = None) -> List[Dict]:
         if not self.serper_api_key:
-            print("Warning: SERPER_API_KEY not set")
-            return []
+            raise RuntimeError("SERPER_API_KEY not set")
             
         headers = {
             'X-API-KEY': self.serper_api_key,
@@ -30,30 +39,30 @@ class WebSearchService:
         }
         
         try:
-            response = requests.post(
+            response = self.http.post(
                 f"{self.base_url}/search",
                 headers=headers,
-                json=payload
+                json=payload,
+                budget=budget
             )
             response.raise_for_status()
-            
             data = response.json()
-            results = []
-            
-            # Extract organic search results
-            for result in data.get('organic', []):
-                results.append({
-                    'title': result.get('title'),
-                    'link': result.get('link'),
-                    'snippet': result.get('snippet'),
-                    'position': result.get('position')
-                })
-                
-            return results
-            
         except Exception as e:
             print(f"Error performing web search: {e}")
-            return []
+            raise
+            
+        results = []
+        
+        # Extract organic search results
+        for result in data.get('organic', []):
+            results.append({
+                'title': result.get('title'),
+                'link': result.get('link'),
+                'snippet': result.get('snippet'),
+                'position': result.get('position')
+            })
+            
+        return results
     
     def search_shopping(self, query: str) -> List[Dict]:
         """
@@ -74,7 +83,7 @@ class WebSearchService:
         }
         
         try:
-            response = requests.post(
+            response = self.http.post(
                 f"{self.base_url}/shopping",
                 headers=headers,
                 json=payload
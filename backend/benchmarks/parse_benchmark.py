@@ -0,0 +1,222 @@
+"""
+Micro-benchmark for the listing and item-detail HTML parsers.
+
+Times app.services.html_parser against the original BeautifulSoup
+(html.parser) implementations on the saved fixtures, and checks that both
+produce the same output dicts. BeautifulSoup is only a dev dependency
+(pip install -r requirements-dev.txt). Run from backend/:
+
+    python -m benchmarks.parse_benchmark [--rounds N] [fixture.html ...]
+
+Files named listing_*.html are parsed as category pages, item_*.html as
+item pages.
+"""
+import argparse
+import glob
+import os
+import re
+import time
+import warnings
+from bs4 import BeautifulSoup
+from app.services.html_parser import parse_listing, parse_item_detail
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+# Original implementations, kept as the reference for output and timing
+
+def legacy_parse_listing(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    
+    # Updated selectors based on the actual website structure
+    products = soup.find_all('div', class_=re.compile(r'item-col'))
+    
+    scraped_data = []
+    for product in products:
+        try:
+            # Find the link element
+            link_elem = product.find('a', href=True)
+            if not link_elem:
+                continue
+                
+            # Extract URL
+            auction_url = link_elem.get('href', '')
+            if not auction_url.startswith('http'):
+                auction_url = f"https://shopgoodwill.com{auction_url}"
+            
+            # Extract title - look for various possible locations
+            title = ''
+            title_elem = product.find(class_=re.compile(r'title|name|feat-item_name'))
+            if title_elem:
+                title = title_elem.text.strip()
+            else:
+                # Try to get title from image alt text
+                img_elem = product.find('img')
+                if img_elem and img_elem.get('alt'):
+                    title = img_elem.get('alt', '').strip()
+            
+            if not title:
+                continue
+                
+            # Extract price
+            price = ''
+            price_elem = product.find(class_=re.compile(r'price|feat-item_price'))
+            if price_elem:
+                price = price_elem.text.strip()
+            else:
+                # Look for any text containing $
+                price_text = product.find(text=re.compile(r'\$[\d,]+\.?\d*'))
+                if price_text:
+                    price = price_text.strip()
+            
+            # Extract image URL
+            image_url = ''
+            img_elem = product.find('img')
+            if img_elem:
+                image_url = img_elem.get('src', '')
+                if not image_url.startswith('http'):
+                    image_url = f"https://shopgoodwill.com{image_url}"
+            
+            # Only add if we have at least title and URL
+            if title and auction_url:
+                scraped_data.append({
+                    'title': title,
+                    'price': price or '$0.00',
+                    'image_url': image_url,
+                    'auction_url': auction_url
+                })
+                
+        except Exception as e:
+            print(f"Error parsing product: {e}")
+            continue
+            
+    return scraped_data
+
+
+def legacy_parse_item_detail(html):
+    soup = BeautifulSoup(html, 'html.parser')
+
+    data = {}
+
+    # Title - look for h1 or h2
+    title_elem = soup.find('h1')
+    if title_elem:
+        data['title'] = title_elem.text.strip()
+
+    # Current price/bid
+    price_elem = soup.find('h2', class_='mb-0')
+    if price_elem:
+        data['current_price'] = price_elem.text.strip()
+
+    # Number of bids
+    bid_info = soup.find(text=re.compile(r'Number of Bids:'))
+    if bid_info:
+        bid_parent = bid_info.parent.parent
+        bid_value = bid_parent.find_next('td')
+        if bid_value:
+            data['num_bids'] = bid_value.text.strip()
+
+    # Extract all images
+    images = []
+
+    # Main image carousel
+    carousel_images = soup.find_all('img', class_='d-block')
+    for img in carousel_images:
+        src = img.get('src', '')
+        if src and 'shopgoodwillimages' in src:
+            images.append(src)
+
+    # Thumbnail images
+    thumb_images = soup.find_all('img', class_='img-thumbnail')
+    for img in thumb_images:
+        src = img.get('src', '')
+        if src and 'shopgoodwillimages' in src:
+            # Convert thumbnail to full size by removing size parameters
+            full_src = re.sub(r'/w_\d+/', '/', src)
+            images.append(full_src)
+
+    # Any other product images
+    all_imgs = soup.find_all('img')
+    for img in all_imgs:
+        src = img.get('src', '')
+        if src and 'shopgoodwillimages' in src and 'Items' in src:
+            if not any(src in existing for existing in images):
+                images.append(src)
+
+    data['all_images'] = list(set(images))  # Remove duplicates
+
+    # Full description - look for the Item Description section
+    desc_header = soup.find('h3', text='Item Description')
+    if desc_header:
+        desc_div = desc_header.find_next_sibling('div')
+        if desc_div:
+            # Get all text including HTML structure
+            data['description_html'] = str(desc_div)
+            # Get plain text version
+            data['description_text'] = desc_div.get_text(separator='\n', strip=True)
+
+    # Item condition and other details from table
+    item_details = {}
+    table_rows = soup.find_all('tr')
+    for row in table_rows:
+        th = row.find('th')
+        td = row.find('td')
+        if th and td:
+            key = th.text.strip().replace(':', '')
+            value = td.text.strip()
+            item_details[key] = value
+
+    data['item_details'] = item_details
+
+    # Seller information
+    seller_elem = soup.find(text='Seller:')
+    if seller_elem:
+        seller_value = seller_elem.parent.find_next('td')
+        if seller_value:
+            data['seller'] = seller_value.text.strip()
+
+    return data
+
+def _comparable_detail(data):
+    # Serialisation of the description markup differs between the two parsers
+    data = dict(data)
+    data.pop('description_html', None)
+    data['all_images'] = sorted(data.get('all_images', []))
+    return data
+
+def _time(fn, html, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn(html)
+    return (time.perf_counter() - start) / rounds * 1000
+
+def main():
+    # The reference code uses BeautifulSoup's deprecated text= argument
+    warnings.filterwarnings("ignore", category=DeprecationWarning)
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("fixtures", nargs="*", help="HTML fixtures (default: benchmarks/fixtures/*.html)")
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    paths = args.fixtures or sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.html")))
+    for path in paths:
+        name = os.path.basename(path)
+        if name.startswith("listing_"):
+            legacy, current, normalise = legacy_parse_listing, parse_listing, lambda d: d
+        elif name.startswith("item_"):
+            legacy, current, normalise = legacy_parse_item_detail, parse_item_detail, _comparable_detail
+        else:
+            print(f"Skipping {name}: expected a listing_ or item_ prefix")
+            continue
+
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+
+        same = normalise(legacy(html)) == normalise(current(html))
+        legacy_ms = _time(legacy, html, args.rounds)
+        current_ms = _time(current, html, args.rounds)
+        print(f"{name}: bs4 {legacy_ms:.2f} ms, lxml {current_ms:.2f} ms "
+              f"({legacy_ms / current_ms:.1f}x), same output: {same}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Check the plain-HTTP fetch backend against a local stub server.
+
+Serves the saved fixtures on localhost, points SHOPGOODWILL_URL and
+SHOPGOODWILL_API_URL at it, and checks that:
+  - item details from the buyer API (api_item_*.json) match what the
+    browser path parses from the saved item page (item_*.html)
+  - a listing page fetched over HTTP parses to the same tiles as the fixture
+  - an API response without price or images is rejected, so 'auto' falls
+    back to the browser
+Run from backend/:
+
+    python -m benchmarks.stub_check
+"""
+import glob
+import json
+import os
+import re
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+class StubHandler(BaseHTTPRequestHandler):
+    # Paths the stub answers, mapped to fixture files
+    routes = [
+        (re.compile(r'^/api/ItemDetail/GetItemDetailModelByItemId/(\d+)$'), "api_item_{}.json", "application/json"),
+        (re.compile(r'^/item/(\d+)$'), "item_{}.html", "text/html"),
+        (re.compile(r'^/categories/([\w-]+)\?p=1$'), "listing_{}.html", "text/html")
+    ]
+    # Overrides for a single request path, as (content type, body)
+    overrides = {}
+
+    def do_GET(self):
+        if self.path in self.overrides:
+            content_type, body = self.overrides[self.path]
+            return self._send(200, content_type, body)
+        for pattern, template, content_type in self.routes:
+            match = pattern.match(self.path)
+            path = match and os.path.join(FIXTURES_DIR, template.format(match.group(1)))
+            if path and os.path.exists(path):
+                with open(path, "rb") as f:
+                    return self._send(200, content_type, f.read())
+        self._send(404, "text/plain", b"not found")
+
+    def _send(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_stub() -> str:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+def _comparable(data):
+    # The page also carries w_120 thumbnails and its own description markup
+    return {
+        'title': data.get('title'),
+        'current_price': data.get('current_price'),
+        'num_bids': data.get('num_bids'),
+        'seller': data.get('seller'),
+        'all_images': sorted(src for src in data.get('all_images', []) if '/w_' not in src),
+        'description_text': ' '.join((data.get('description_text') or '').split())
+    }
+
+def main() -> int:
+    base_url = start_stub()
+    # The clients read their base URLs at import time
+    os.environ["SHOPGOODWILL_URL"] = base_url
+    os.environ["SHOPGOODWILL_API_URL"] = f"{base_url}/api"
+    from app.services.html_parser import parse_item_detail, parse_listing
+    from app.services.shopgoodwill_api import shopgoodwill
+    from app.services.scraper import scrape_page, category_url
+
+    failures = []
+
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "api_item_*.json"))):
+        item_id = re.search(r'api_item_(\d+)\.json$', path).group(1)
+        item_url = f"{base_url}/item/{item_id}"
+        from_api = _comparable(shopgoodwill.get_item_detail(item_url))
+        from_page = _comparable(parse_item_detail(shopgoodwill.fetch_html(item_url)))
+        differing = [field for field, value in from_page.items() if from_api[field] != value]
+        for field in differing:
+            failures.append(f"item {item_id}: {field} differs: api {from_api[field]!r}, page {from_page[field]!r}")
+        if not differing:
+            print(f"item {item_id}: api and page agree on {', '.join(from_api)}")
+
+        with open(path) as f:
+            item = json.load(f)
+        item['imageUrlString'] = ''
+        StubHandler.overrides[f"/api/ItemDetail/GetItemDetailModelByItemId/{item_id}"] = (
+            "application/json", json.dumps(item).encode()
+        )
+        try:
+            shopgoodwill.get_item_detail(item_url)
+            failures.append(f"item {item_id}: response without images was accepted")
+        except ValueError as e:
+            print(f"item {item_id}: response without images rejected ({e})")
+        StubHandler.overrides.clear()
+
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "listing_*.html"))):
+        category = re.search(r'listing_([\w-]+)\.html$', path).group(1)
+        with open(path, encoding="utf-8") as f:
+            expected = parse_listing(f.read())
+        items = scrape_page(category_url(category, 1), backend='http')
+        if items != expected:
+            failures.append(f"listing {category}: {len(items)} tiles over HTTP, {len(expected)} in the fixture")
+        else:
+            print(f"listing {category}: {len(items)} tiles over HTTP match the fixture")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,5 @@
 #!/bin/sh
 set -e
+# Apply schema migrations once, before any worker starts
+python -m app.migrations upgrade
 uvicorn app.main:app --host 0.0.0.0 --port ${PORT:-10000} 
\ No newline at end of file
@@ -13,7 +13,8 @@ interface Auction {
   image_url: string;
   auction_url: string;
   estimated_value: number | null;
-  analysis: string | null;
+  analysis?: string | null;
+  analysis_preview?: string | null;
   is_watchlisted: boolean;
   all_images?: string[];
   description?: string;
@@ -22,10 +23,25 @@ interface Auction {
   item_details?: Record<string, unknown>;
 }
 
+interface AnalysisJob {
+  id: string;
+  status: 'queued' | 'running' | 'succeeded' | 'partial' | 'failed';
+  completed: number;
+  failed: number;
+  results: Record<string, { status: string; error?: string }> | null;
+}
+
+// The grid only needs these; full records are loaded when a card is opened
+const LIST_FIELDS = 'title,price,image_url,auction_url,estimated_value,is_watchlisted,analysis_preview';
+const PAGE_SIZE = 60;
+
 export default function Home() {
   const [auctions, setAuctions] = useState<Auction[]>([]);
+  const [nextCursor, setNextCursor] = useState<number | null>(null);
   const [isLoading, setIsLoading] = useState(false);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [analyzingIds, setAnalyzingIds] = useState<Set<number>>(new Set());
+  const [progress, setProgress] = useState<Record<number, string>>({});
   const [isBatchAnalyzing, setIsBatchAnalyzing] = useState(false);
   const [selectedIds, setSelectedIds] = useState<Set<number>>(new Set());
   const [error, setError] = useState<string | null>(null);
@@ -37,10 +53,11 @@ export default function Home() {
   const fetchAuctions = useCallback(async () => {
     setIsLoading(true);
     try {
-      const response = await fetch(`${backendUrl}/auctions`);
+      const response = await fetch(`${backendUrl}/auctions?fields=${LIST_FIELDS}&limit=${PAGE_SIZE}`);
       if (!response.ok) throw new Error('Failed to fetch auctions');
       const data = await response.json();
       setAuctions(data.auctions);
+      setNextCursor(data.next_cursor);
     } catch (err) {
       setError(err instanceof Error ? err.message : 'An unknown error occurred');
     } finally {
@@ -48,6 +65,22 @@ export default function Home() {
     }
   }, [backendUrl]);
 
+  const loadMore = async () => {
+    if (nextCursor === null) return;
+    setIsLoadingMore(true);
+    try {
+      const response = await fetch(`${backendUrl}/auctions?fields=${LIST_FIELDS}&limit=${PAGE_SIZE}&after_id=${nextCursor}`);
+      if (!response.ok) throw new Error('Failed to fetch auctions');
+      const data = await response.json();
+      setAuctions(prev => [...prev, ...data.auctions]);
+      setNextCursor(data.next_cursor);
+    } catch (err) {
+      setError(err instanceof Error ? err.message : 'An unknown error occurred');
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     fetchAuctions();
   }, [fetchAuctions]);
@@ -58,8 +91,8 @@ export default function Home() {
     try {
       const response = await fetch(`${backendUrl}/scrape`, { method: 'POST' });
       if (!response.ok) throw new Error('Failed to fetch auctions');
-      const data = await response.json();
-      setAuctions(data.auctions);
+      // The scrape only reports counts; reload the list to pick up new items
+      await fetchAuctions();
     } catch (err) {
       setError(err instanceof Error ? err.message : 'An unknown error occurred');
     } finally {
@@ -71,14 +104,50 @@ export default function Home() {
     // Add to analyzing set
     setAnalyzingIds(prev => new Set(prev).add(auctionId));
     
+    const report = (message: string) => setProgress(prev => ({ ...prev, [auctionId]: message }));
+    report('Starting analysis...');
+    
     try {
-      const response = await fetch(`${backendUrl}/analyze/${auctionId}`, { method: 'POST' });
-      if (!response.ok) throw new Error('Failed to analyze auction');
-      const updatedAuction = await response.json();
-      setAuctions(prevAuctions => prevAuctions.map(a => a.id === auctionId ? updatedAuction : a));
+      // Server-sent events: stage / source / token progress, then the saved auction
+      const response = await fetch(`${backendUrl}/analyze/${auctionId}/stream`, { method: 'POST' });
+      if (!response.ok || !response.body) throw new Error('Failed to analyze auction');
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let sources = 0;
+      let written = 0;
+      let updatedAuction: Auction | null = null;
+      
+      while (updatedAuction === null) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const frames = buffer.split('\n\n');
+        buffer = frames.pop() ?? '';
+        for (const frame of frames) {
+          const event = frame.match(/^event: (.*)$/m)?.[1];
+          const data = JSON.parse(frame.match(/^data: (.*)$/m)?.[1] ?? 'null');
+          if (event === 'stage') {
+            report(`${data.stage === 'model' ? 'Appraising' : data.stage === 'research' ? 'Research done' : 'Details loaded'}...`);
+          } else if (event === 'source') {
+            sources += 1;
+            report(`Researching prices (${sources} sources)...`);
+          } else if (event === 'token') {
+            written += data.text.length;
+            report(`Writing analysis (${written} characters)...`);
+          } else if (event === 'done') {
+            updatedAuction = data as Auction;
+          } else if (event === 'error') {
+            throw new Error(data.detail);
+          }
+        }
+      }
+      if (updatedAuction === null) throw new Error('Analysis ended unexpectedly');
+      const analyzed: Auction = updatedAuction;
+      setAuctions(prevAuctions => prevAuctions.map(a => a.id === auctionId ? analyzed : a));
       // Update modal auction if it's the same one
       if (selectedAuction && selectedAuction.id === auctionId) {
-        setSelectedAuction(updatedAuction);
+        setSelectedAuction(analyzed);
       }
     } catch (err) {
       setError(err instanceof Error ? err.message : 'An unknown error occurred');
@@ -89,6 +158,11 @@ export default function Home() {
         newSet.delete(auctionId);
         return newSet;
       });
+      setProgress(prev => {
+        const rest = { ...prev };
+        delete rest[auctionId];
+        return rest;
+      });
     }
   };
 
@@ -112,14 +186,29 @@ export default function Home() {
       
       if (!response.ok) throw new Error('Failed to analyze batch');
       
-      const result = await response.json();
+      // The batch runs as a background job; poll it until it finishes
+      const { job_id } = await response.json();
+      let job: AnalysisJob;
+      do {
+        await new Promise(resolve => setTimeout(resolve, 2000));
+        const jobResponse = await fetch(`${backendUrl}/jobs/${job_id}`);
+        if (!jobResponse.ok) throw new Error('Failed to check batch progress');
+        job = await jobResponse.json();
+      } while (job.status === 'queued' || job.status === 'running');
       
       // Update auctions with analyzed results
-      if (result.analyzed && result.analyzed.length > 0) {
+      const results = job.results || {};
+      const analyzedIds = Object.keys(results)
+        .filter(id => results[id].status === 'succeeded')
+        .map(Number);
+      const analyzed: Auction[] = await Promise.all(
+        analyzedIds.map(id => fetch(`${backendUrl}/auctions/${id}`).then(r => r.json()))
+      );
+      if (analyzed.length > 0) {
         setAuctions(prevAuctions => 
           prevAuctions.map(auction => {
-            const analyzed = result.analyzed.find((a: Auction) => a.id === auction.id);
-            return analyzed || auction;
+            const updated = analyzed.find(a => a.id === auction.id);
+            return updated || auction;
           })
         );
       }
@@ -128,8 +217,8 @@ export default function Home() {
       setSelectedIds(new Set());
       
       // Show summary
-      if (result.total_errors > 0) {
-        setError(`Analyzed ${result.total_analyzed} items. ${result.total_errors} errors occurred.`);
+      if (job.failed > 0) {
+        setError(`Analyzed ${job.completed} items. ${job.failed} errors occurred.`);
       }
     } catch (err) {
       setError(err instanceof Error ? err.message : 'An unknown error occurred');
@@ -153,9 +242,16 @@ export default function Home() {
     }
   };
 
-  const openAuctionDetails = (auction: Auction) => {
+  const openAuctionDetails = async (auction: Auction) => {
     setSelectedAuction(auction);
     setModalOpened(true);
+    try {
+      const response = await fetch(`${backendUrl}/auctions/${auction.id}`);
+      if (!response.ok) throw new Error('Failed to fetch auction details');
+      setSelectedAuction(await response.json());
+    } catch (err) {
+      setError(err instanceof Error ? err.message : 'An unknown error occurred');
+    }
   };
 
   const toggleSelection = (auctionId: number) => {
@@ -303,7 +399,7 @@ export default function Home() {
                 )}
 
                 <Text size="sm" c="dimmed" mt="sm" lineClamp={3}>
-                  {auction.analysis || 'No analysis yet.'}
+                  {progress[auction.id] ?? auction.analysis ?? auction.analysis_preview ?? 'No analysis yet.'}
                 </Text>
                 
                 <Group mt="md">
@@ -318,7 +414,7 @@ export default function Home() {
                     color="grape" 
                     fullWidth
                   >
-                    {auction.analysis ? 'Re-analyze' : 'Analyze'}
+                    {(auction.analysis ?? auction.analysis_preview) ? 'Re-analyze' : 'Analyze'}
                   </Button>
                 </Group>
               </Card>
@@ -326,6 +422,14 @@ export default function Home() {
           ))
         )}
       </Grid>
+
+      {nextCursor !== null && (
+        <Group justify="center" mt="md">
+          <Button onClick={loadMore} loading={isLoadingMore} variant="light">
+            Load More
+          </Button>
+        </Group>
+      )}
     </AppLayout>
   );
 }
\ No newline at end of file
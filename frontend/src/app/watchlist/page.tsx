@@ -29,7 +29,7 @@ export default function WatchlistPage() {
   const fetchAuctions = useCallback(async () => {
     setIsLoading(true);
     try {
-      const response = await fetch(`${backendUrl}/auctions`);
+      const response = await fetch(`${backendUrl}/auctions?watchlisted=true&limit=500`);
       if (!response.ok) throw new Error('Failed to fetch auctions');
       const data = await response.json();
       setAuctions(data.auctions);
@@ -12,13 +12,17 @@ interface Auction {
   image_url: string;
   auction_url: string;
   estimated_value: number | null;
-  analysis: string | null;
+  analysis?: string | null;
   is_watchlisted: boolean;
   all_images?: string[];
   description?: string;
   seller?: string;
   num_bids?: string;
   item_details?: Record<string, unknown>;
+  value_confidence?: string | null;
+  condition_grade?: string | null;
+  condition_notes?: string | null;
+  item_breakdown?: ParsedItem[] | null;
 }
 
 interface AuctionModalProps {
@@ -31,6 +35,7 @@ interface AuctionModalProps {
 interface ParsedItem {
   description: string;
   value: number;
+  source?: string;
 }
 
 interface MarketResearchData {
@@ -83,6 +88,10 @@ export function AuctionModal({ auction, opened, onClose, onToggleWatchlist }: Au
   // Parse analysis for structured data
   const parsedAnalysis = useMemo(() => {
     if (!auction || !auction.analysis) return { items: [], summary: '' };
+    // Newer analyses store the breakdown as structured data
+    if (auction.item_breakdown) {
+      return { items: auction.item_breakdown, summary: auction.analysis };
+    }
     
     const lines = auction.analysis.split('\n');
     const items: ParsedItem[] = [];
@@ -197,11 +206,16 @@ export function AuctionModal({ auction, opened, onClose, onToggleWatchlist }: Au
             <Paper shadow="xs" p="md">
               <Group justify="space-between" mb="md">
                 <Text fw={700}>Auction Details</Text>
-                {auction.estimated_value && (
-                  <Badge color="yellow" size="lg">
-                    Est. Value: ${auction.estimated_value.toFixed(2)}
-                  </Badge>
-                )}
+                <Group gap="xs">
+                  {auction.value_confidence && (
+                    <Badge color="gray" size="lg">{auction.value_confidence} confidence</Badge>
+                  )}
+                  {auction.estimated_value && (
+                    <Badge color="yellow" size="lg">
+                      Est. Value: ${auction.estimated_value.toFixed(2)}
+                    </Badge>
+                  )}
+                </Group>
               </Group>
               
               <Table>
@@ -222,6 +236,15 @@ export function AuctionModal({ auction, opened, onClose, onToggleWatchlist }: Au
                       <Table.Td>{auction.seller}</Table.Td>
                     </Table.Tr>
                   )}
+                  {auction.condition_grade && (
+                    <Table.Tr>
+                      <Table.Td fw={600}>Condition</Table.Td>
+                      <Table.Td>
+                        {auction.condition_grade}
+                        {auction.condition_notes && ` - ${auction.condition_notes}`}
+                      </Table.Td>
+                    </Table.Tr>
+                  )}
                   {auction.estimated_value && (
                     <Table.Tr>
                       <Table.Td fw={600}>Profit Potential</Table.Td>